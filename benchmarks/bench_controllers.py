@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+Microbenchmarks for the projection controllers and compositing
+- Synthetic camera frames and generated clips (no camera or display needed)
+- Stub YOLO model (no GPU or model file needed) and a stand-in vlc module
+  when libvlc is missing (the VLC controller is benchmarked without playback)
+- Several frame resolutions
+- Stored baselines with a regression threshold (on the best round; a suspect
+  case is re-run and only fails if it is slow every time, beyond any slowdown
+  of the whole machine measured by a fixed calibration workload)
+
+Usage:
+    python benchmarks/bench_controllers.py --save-baseline       # record this machine's baseline
+    python benchmarks/bench_controllers.py                       # compare against it (exit 1 on regression)
+    python benchmarks/bench_controllers.py --resolutions 640x480 --filter debug
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import types
+
+import cv2
+import numpy as np
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+sys.path.insert(0, os.path.join(REPO_ROOT, "scripts"))
+
+try:
+    import vlc  # noqa: F401
+except Exception:  # python-vlc needs libvlc, which headless boxes may lack; no case plays anything
+    sys.modules["vlc"] = types.ModuleType("vlc")
+
+from simple_projection import ProjectionSink, SimpleProjectionController  # noqa: E402
+from yolo_vlc_projection import VLCProjectionController  # noqa: E402
+from projection import (FramePacket, HandTriggerPolicy, Presenter, ProjectionMetrics, ProjectionOutput,  # noqa: E402
+                        ProjectionWarp, YoloClassifier, parse_classification)
+
+DEFAULT_RESOLUTIONS = "640x480,1280x720,1920x1080"
+STREAM_FRAMES = 300  # Streamed-decode clip length (10 s at 30 FPS)
+CALIBRATION = "_calibration"  # Baseline entry of the machine-speed reference workload
+KEYSTONE_CORNERS = [[0.02, 0.0], [0.97, 0.03], [1.0, 1.0], [0.0, 0.96]]  # Mild projector keystone
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines",
+                                f"{platform.node() or 'local'}.json")
+
+
+# ---------------------------------------------------------------------------
+# Synthetic inputs
+# ---------------------------------------------------------------------------
+
+def synthetic_frame(width, height, seed=0):
+    """Camera-like frame: smooth gradient plus noise"""
+    rng = np.random.default_rng(seed)
+    gradient = np.linspace(0, 255, width, dtype=np.float32)[None, :].repeat(height, axis=0)
+    frame = np.dstack([gradient, gradient[::-1], np.full_like(gradient, 96)])
+    frame += rng.normal(0, 12, frame.shape).astype(np.float32)
+    return np.clip(frame, 0, 255).astype(np.uint8)
+
+
+def write_clip(path, width, height, frames=30, fps=30.0):
+    """Write a short moving-pattern clip for decode benchmarks"""
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), fps, (width, height))
+    if not writer.isOpened():
+        raise IOError(f"Could not write benchmark clip: {path}")
+    base = synthetic_frame(width, height)
+    for i in range(frames):
+        writer.write(np.roll(base, i * 8, axis=1))
+    writer.release()
+
+
+class _StubProbs:
+    def __init__(self, top1, top1conf):
+        self.top1 = top1
+        self.top1conf = top1conf
+
+
+class _StubResult:
+    names = {0: 'hand', 1: 'not_hand'}
+
+    def __init__(self, top1, top1conf):
+        self.probs = _StubProbs(top1, top1conf)
+
+
+class StubModel:
+    """Stands in for ultralytics.YOLO: alternates hand / not_hand results"""
+    names = {0: 'hand', 1: 'not_hand'}
+
+    def __init__(self):
+        self.calls = 0
+
+    def predict(self, frame, verbose=False):
+        self.calls += 1
+        return [_StubResult(self.calls % 2, 0.95)]
+
+
+class BenchVLCController(VLCProjectionController):
+    """VLC controller without a VLC instance; playback is a no-op"""
+
+    def __init__(self):
+        HandTriggerPolicy.__init__(self, confidence_threshold=0.99, scare_duration=2.0, debounce_time=0.5)
+
+    def play_video(self, video_path, loop=True):
+        return True
+
+
+# ---------------------------------------------------------------------------
+# Timing
+# ---------------------------------------------------------------------------
+
+def measure(func, min_time=0.2, repeat=5):
+    """Per-call seconds: (median, best) over `repeat` rounds of ~min_time each"""
+    func()  # Warm up
+
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time / 4 or number >= 1 << 20:
+            break
+        number *= 2
+    number = max(1, int(number * (min_time / max(elapsed, 1e-9))))
+
+    rounds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        rounds.append((time.perf_counter() - start) / number)
+    return statistics.median(rounds), min(rounds)
+
+
+_CALIBRATION_FRAME = synthetic_frame(320, 240, seed=2)
+
+
+def calibration_workload():
+    """Fixed mix of OpenCV and interpreter work; its speed tracks the machine, not the code"""
+    cv2.GaussianBlur(_CALIBRATION_FRAME, (5, 5), 0)
+    total = 0
+    for i in range(2000):
+        total += i * i
+    return total
+
+
+def machine_slowdown(baseline, min_time, repeat):
+    """How much slower the calibration workload runs now than when the baseline was saved (>= 1)"""
+    reference = baseline.get(CALIBRATION)
+    if reference is None:
+        return 1.0
+    return max(1.0, measure(calibration_workload, min_time, repeat)[1] / reference["best"])
+
+
+# ---------------------------------------------------------------------------
+# Benchmark cases
+# ---------------------------------------------------------------------------
+
+def build_cases(resolutions, workdir):
+    """Yield (name, callable) benchmark cases"""
+    for width, height in resolutions:
+        res = f"{width}x{height}"
+        camera_frame = synthetic_frame(width, height, seed=1)
+
+        sleep_path = os.path.join(workdir, f"sleep_{res}.mp4")
+        scare_path = os.path.join(workdir, f"scare_{res}.mp4")
+        write_clip(sleep_path, width, height)
+        write_clip(scare_path, width, height)
+
+        # Compositing as the render loop does it: one scale per output (grey-border
+        # fix and production stretch folded into the crop), overlay in debug mode
+        controller = SimpleProjectionController(sleep_path, scare_path, cache_budget_mb=4096)
+        clip_frame = controller.get_current_video_frame()
+        main = ProjectionOutput("main", (width, height))
+        overlay = lambda display, c=controller, cam=camera_frame: c.draw_debug_overlay(display, cam, "hand", 0.9)
+        yield (f"ProjectionOutput.scale[clean,{res}]", lambda o=main, v=clip_frame: o.scale(v))
+        yield (f"ProjectionOutput.scale[production,{res}]", lambda o=main, v=clip_frame: o.scale(v, production=True))
+        yield (f"ProjectionOutput.render[debug,{res}]",
+               lambda o=main, v=clip_frame, d=overlay: o.render(v, debug=True, overlay=d))
+
+        # Whole sink per frame: the main window alone, and fanned out to a cropped
+        # hallway display and a keystoned projector as well
+        for label, extra in (("main", []),
+                             ("fanout-3", [ProjectionOutput("hallway", (1280, 720), mode="clean",
+                                                            crop=(0.0, 0.1, 1.0, 0.8)),
+                                           ProjectionOutput("projector", (width, height), mode="clean",
+                                                            warp=ProjectionWarp((width, height),
+                                                                                corners=KEYSTONE_CORNERS,
+                                                                                cache_dir=None))])):
+            outputs = [ProjectionOutput("main", (width, height))] + extra
+            presenter = Presenter("main")
+            outputs[0].window_name = "main"
+            for output in extra:
+                output.window_name = output.name
+                presenter.add_window(output.name)
+            sink = ProjectionSink(controller, presenter, ProjectionMetrics(), outputs, decode_queue=0)
+            packet = FramePacket(1, camera_frame, time.perf_counter())
+            yield (f"ProjectionSink.consume[{label},{res}]", lambda s=sink, p=packet: s.consume(p))
+
+        # Keystone correction: one remap into the warp's buffer ring, the render
+        # path that presents it, and the decoder-thread variant into fresh frames
+        warp = ProjectionWarp((width, height), corners=KEYSTONE_CORNERS, cache_dir=None)
+        warped = ProjectionOutput("warped", (width, height), warp=warp)
+        yield (f"ProjectionWarp.apply[{res}]", lambda w=warp, v=clip_frame: w.apply(v))
+        yield (f"ProjectionOutput.render[warp,{res}]", lambda o=warped, v=clip_frame: o.render(v))
+        yield (f"ProjectionOutput.scale[warp,fresh,{res}]", lambda o=warped, v=clip_frame: o.scale(v, fresh=True))
+
+        # Video frame retrieval: clip held in RAM vs streamed from the decoder. The
+        # streamed clip is far longer than its one-frame hot-start buffer, so reads
+        # really decode (with a restart only every STREAM_FRAMES frames).
+        yield (f"get_current_video_frame[cached,{res}]", controller.get_current_video_frame)
+        stream_path = os.path.join(workdir, f"stream_{res}.mp4")
+        write_clip(stream_path, width, height, frames=STREAM_FRAMES)
+        streamed = SimpleProjectionController(stream_path, stream_path, hot_start_frames=1, cache_budget_mb=0)
+        yield (f"get_current_video_frame[streamed,{res}]", streamed.get_current_video_frame)
+
+        # Classification parsing on a stub model at this resolution
+        classifier = YoloClassifier(StubModel())
+        yield (f"classify[stub,{res}]", lambda c=classifier, f=camera_frame: c.classify(f))
+
+        controller.release()
+        streamed.release()
+
+    # Resolution-independent state machine and parsing (small clips keep RAM use low)
+    sleep_path = os.path.join(workdir, "sleep_small.mp4")
+    scare_path = os.path.join(workdir, "scare_small.mp4")
+    write_clip(sleep_path, 160, 120)
+    write_clip(scare_path, 160, 120)
+    controller = SimpleProjectionController(sleep_path, scare_path, cache_budget_mb=4096)
+    yield ("process_hand_detection[idle]",
+           lambda c=controller: c.process_hand_detection("not_hand", 0.2))
+    scare_controller = SimpleProjectionController(sleep_path, scare_path, cache_budget_mb=4096)
+    scare_controller.scare_duration = 1e9
+    scare_controller.process_hand_detection("hand", 1.0)
+    yield ("process_hand_detection[scare-hold]",
+           lambda c=scare_controller: c.process_hand_detection("hand", 1.0))
+
+    result = _StubResult(0, 0.97)
+    yield ("parse_classification", lambda r=result: parse_classification(r))
+
+    vlc_controller = BenchVLCController()
+    not_hand = _StubResult(1, 0.97)
+    yield ("process_classification[vlc]", lambda c=vlc_controller, r=not_hand: c.process_classification(r))
+
+
+# ---------------------------------------------------------------------------
+# Baselines
+# ---------------------------------------------------------------------------
+
+def compare(results, baseline, threshold, slowdown=1.0):
+    """(name, ratio) of cases whose best round is slower than baseline by more than threshold"""
+    regressions = []
+    for name, (_, best) in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            continue
+        ratio = best / reference["best"] / slowdown
+        if ratio > 1.0 + threshold:
+            regressions.append((name, ratio))
+    return regressions
+
+
+def parse_resolutions(text):
+    resolutions = []
+    for item in text.split(","):
+        width, height = item.lower().split("x")
+        resolutions.append((int(width), int(height)))
+    return resolutions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Projection controller microbenchmarks")
+    parser.add_argument("--resolutions", default=DEFAULT_RESOLUTIONS, help="Comma-separated WxH list")
+    parser.add_argument("--filter", default="", help="Only run cases whose name contains this text")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Seconds per timing round")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing rounds per case")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON file")
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed slowdown vs baseline (0.25 = 25%%)")
+    parser.add_argument("--confirm", type=int, default=2,
+                        help="Re-runs of a suspect case; it only fails if every run is slow")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    cv2.setNumThreads(1)  # Stable numbers across runs
+
+    baseline = None
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    results = {}
+    regressions = []
+    with tempfile.TemporaryDirectory(prefix="projection-bench-") as workdir:
+        print(f"{'case':<48} {'median':>12} {'best':>12}")
+        print("-" * 74)
+        for name, func in build_cases(parse_resolutions(args.resolutions), workdir):
+            if args.filter and args.filter not in name:
+                continue
+            median, best = measure(func, args.min_time, args.repeat)
+            note = ""
+            # A slow spell (scheduler, thermal, another process) is not a regression:
+            # re-measure suspects next to the calibration workload and only flag
+            # those that are slow every time, beyond what the machine's slowdown explains
+            slowdown = 1.0
+            for attempt in range(args.confirm):
+                if not baseline or not compare({name: (median, best)}, baseline, args.threshold, slowdown):
+                    break
+                slowdown = machine_slowdown(baseline, args.min_time, args.repeat)
+                rerun_median, rerun_best = measure(func, args.min_time, args.repeat)
+                median, best = min(median, rerun_median), min(best, rerun_best)
+                note = f"  ({attempt + 2} runs, machine {slowdown:.2f}x slower)"
+            if baseline:
+                regressions += compare({name: (median, best)}, baseline, args.threshold, slowdown)
+            results[name] = (median, best)
+            print(f"{name:<48} {median * 1e6:>10.1f}µs {best * 1e6:>10.1f}µs{note}")
+
+    if args.save_baseline:
+        results[CALIBRATION] = measure(calibration_workload, args.min_time, args.repeat)
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        data = {name: {"median": median, "best": best} for name, (median, best) in results.items()}
+        with open(args.baseline, "w") as f:
+            json.dump(data, f, indent=2, sort_keys=True)
+        print(f"\n💾 Baseline saved: {args.baseline}")
+        return 0
+
+    if baseline is None:
+        print(f"\nℹ️  No baseline at {args.baseline} (run with --save-baseline)")
+        return 0
+
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s) over {args.threshold:.0%}:")
+        for name, ratio in regressions:
+            print(f"   {name}: {ratio:.2f}x baseline")
+        return 1
+    print(f"\n✅ No regressions over {args.threshold:.0%} vs {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
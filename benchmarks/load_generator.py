@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Load generator for the capture → classify → decide → output pipeline
+- Synthetic cameras at any resolution/FPS (no camera needed)
+- Stub classifier with configurable latency (no model or GPU needed)
+- Several cameras at once, each running its own pipeline thread
+- Optional render stage compositing to an output resolution
+
+Reports achieved vs target FPS, dropped camera frames, mean per-stage
+latency, how many injected hand events triggered a scare and how fast, and
+the capture → output trigger latency breakdown from the pipeline's tracer.
+
+Usage:
+    python benchmarks/load_generator.py --cameras 4 --latency-ms 20
+    python benchmarks/load_generator.py --source "synthetic:3840x2160@60?motion=noise" --sink render
+"""
+
+import argparse
+import logging
+import os
+import statistics
+import sys
+import threading
+import time
+
+import cv2
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from projection import (CameraSource, HandTriggerPolicy, LatencyTracer, Pipeline, ProjectionMetrics,  # noqa: E402
+                        Sink, StubClassifier, SyntheticCapture)
+from projection.tracing import PERCENTILES, STAGES, percentile  # noqa: E402
+
+DEFAULT_SOURCE = "synthetic:1280x720@30?hand_every=5&hand_duration=1"
+
+
+class TriggerRecorder(Sink):
+    """Remembers when each scare was triggered; the last sink, so it also ends latency traces"""
+
+    name = "record"
+
+    def __init__(self):
+        self.triggers = []  # (captured_at, output_done_at)
+
+    def consume(self, packet):
+        if packet.triggered:
+            now = time.perf_counter()
+            self.triggers.append((packet.captured_at, now))
+            if packet.trace is not None:
+                packet.trace.presented(now)
+        return True
+
+
+class RenderSink(Sink):
+    """Scales the camera frame to the output size, like the compositing stage"""
+
+    name = "render"
+
+    def __init__(self, output_size):
+        self.output_size = output_size
+        self.frames = 0
+
+    def consume(self, packet):
+        cv2.resize(packet.frame, self.output_size, interpolation=cv2.INTER_LINEAR)
+        self.frames += 1
+        return True
+
+
+def onset_latencies(onsets, triggers):
+    """Seconds from each hand onset to the first trigger decided after it"""
+    latencies = []
+    for i, onset in enumerate(onsets):
+        next_onset = onsets[i + 1] if i + 1 < len(onsets) else float("inf")
+        for _, decided_at in triggers:
+            if onset <= decided_at < next_onset:
+                latencies.append(decided_at - onset)
+                break
+    return latencies
+
+
+def parse_size(text):
+    width, height = text.lower().split("x")
+    return int(width), int(height)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Synthetic load test for the projection pipeline")
+    parser.add_argument("--cameras", type=int, default=1, help="Number of simultaneous synthetic cameras")
+    parser.add_argument("--source", default=DEFAULT_SOURCE, help="synthetic[:WxH][@FPS][?options] spec per camera")
+    parser.add_argument("--latency-ms", type=float, default=10.0, help="Stub inference latency")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Stub inference latency jitter (+/-)")
+    parser.add_argument("--busy", action="store_true", help="Burn CPU for the stub latency instead of sleeping")
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds to run")
+    parser.add_argument("--sink", choices=["null", "render"], default="null", help="Output stage to simulate")
+    parser.add_argument("--output", default="1920x1080", help="Render output size for --sink render")
+    parser.add_argument("--conf", type=float, default=0.7, help="Trigger confidence threshold")
+    parser.add_argument("--scare-duration", type=float, default=0.5, help="Seconds before returning to idle")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+
+    tracer = LatencyTracer(log_each=False)
+    runs = []
+    for i in range(args.cameras):
+        capture = SyntheticCapture.from_spec(args.source)
+        recorder = TriggerRecorder()
+        sinks = [recorder]
+        if args.sink == "render":
+            sinks.insert(0, RenderSink(parse_size(args.output)))
+        metrics = ProjectionMetrics()
+        pipeline = Pipeline(
+            CameraSource(capture, threaded=True),
+            StubClassifier(args.latency_ms, args.jitter_ms, busy=args.busy, seed=i),
+            HandTriggerPolicy(confidence_threshold=args.conf, scare_duration=args.scare_duration),
+            sinks,
+            metrics=metrics,
+            tracer=tracer
+        )
+        thread = threading.Thread(target=pipeline.run, name=f"pipeline-{i}", daemon=True)
+        runs.append((capture, recorder, metrics, pipeline, thread))
+
+    first = runs[0][0]
+    print(f"🧪 {args.cameras} camera(s) {first.width}x{first.height}@{first.fps:g} motion={first.motion}, "
+          f"stub {args.latency_ms:g}±{args.jitter_ms:g} ms{' busy' if args.busy else ''}, "
+          f"sink={args.sink}, {args.duration:g}s")
+
+    started = time.perf_counter()
+    for *_, thread in runs:
+        thread.start()
+    try:
+        time.sleep(args.duration)
+    except KeyboardInterrupt:
+        pass
+    elapsed = time.perf_counter() - started
+    for _, _, _, pipeline, _ in runs:
+        pipeline.stop()
+    for _, _, _, pipeline, thread in runs:
+        thread.join(timeout=2.0)
+        pipeline.source.release()
+
+    print(f"\n{'camera':<8} {'fps':>8} {'target':>8} {'dropped':>8} {'hands':>6} {'trig':>6} "
+          f"{'p50 ms':>8} {'p95 ms':>8}")
+    print("-" * 68)
+    all_latencies = []
+    stage_totals = {}
+    for i, (capture, recorder, metrics, pipeline, _) in enumerate(runs):
+        # Only count onsets old enough to have been classified before shutdown
+        onsets = [t for t in capture.hand_onsets if t < started + elapsed - 0.5]
+        latencies = onset_latencies(onsets, recorder.triggers)
+        all_latencies.extend(latencies)
+        for stage, total in metrics.stage_sums.items():
+            count = sum(metrics.stage_buckets[stage])
+            sums = stage_totals.setdefault(stage, [0.0, 0])
+            sums[0] += total
+            sums[1] += count
+        print(f"{i:<8} {pipeline.frame_count / elapsed:>8.1f} {capture.fps:>8.1f} {pipeline.source.dropped:>8} "
+              f"{len(onsets):>6} {len(latencies):>6} "
+              f"{percentile(latencies, 50) * 1000:>8.1f} {percentile(latencies, 95) * 1000:>8.1f}")
+
+    print("\nMean stage latency (all cameras):")
+    for stage, (total, count) in stage_totals.items():
+        if count:
+            print(f"   {stage:<10} {total / count * 1000:>8.2f} ms")
+    if all_latencies:
+        print(f"\nHand onset → trigger: p50 {percentile(all_latencies, 50) * 1000:.1f} ms, "
+              f"p95 {percentile(all_latencies, 95) * 1000:.1f} ms, "
+              f"max {max(all_latencies) * 1000:.1f} ms, mean {statistics.mean(all_latencies) * 1000:.1f} ms")
+    if tracer.traces:
+        report = tracer.report()
+        print(f"\nTrigger latency, capture → output done ({len(tracer.traces)} triggers, ms):")
+        print(f"   {'stage':<10} " + " ".join(f"{f'p{q}':>8}" for q in PERCENTILES))
+        for name in ("total",) + STAGES:
+            print(f"   {name:<10} " + " ".join(f"{report[name][q] * 1000:>8.1f}" for q in PERCENTILES))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,63 @@
+"""
+Shared building blocks for the Halloween projection scripts
+- Capture → classify → decide → output pipeline with pluggable stages
+- Live metrics and control endpoint for the running projection loop
+- Projection geometry (keystone / mesh warp via precomputed remap maps)
+- Clip playback with instant restart (RAM cache or keyframe index + hot start)
+- Background prefetching decoders with bounded frame queues
+- Display presenter with a one-slot mailbox and refresh-paced presentation
+- Multi-output fan-out (per-output size, crop, warp and mode; one scale each)
+- Synthetic camera source and stub classifier for load testing
+- Clip transcode cache (output-sized all-intra MJPG or raw frames)
+- Capture-to-projection latency tracing with per-trigger percentiles
+"""
+
+from .clips import CachedClip, HotStartClip, SeekIndex, open_clip
+from .control import ControlServer, ProjectionMetrics
+from .decode import DecodeEngine, PrefetchDecoder
+from .geometry import ProjectionWarp, calibrate_corners
+from .outputs import ProjectionOutput
+from .pipeline import (CameraSource, Classifier, FramePacket, HandTriggerPolicy, Pipeline, Policy,
+                       Sink, Source, YoloClassifier, parse_classification)
+from .presenter import FrameMailbox, Presenter, PresenterWindow
+from .synthetic import StubClassifier, SyntheticCapture, is_stub_model, is_synthetic, open_capture
+from .tracing import LatencyTrace, LatencyTracer
+from .transcode import RawClip, find_transcoded, open_prepared_clip, transcode_clip
+
+__all__ = [
+    "CachedClip",
+    "CameraSource",
+    "Classifier",
+    "ControlServer",
+    "DecodeEngine",
+    "FrameMailbox",
+    "FramePacket",
+    "HandTriggerPolicy",
+    "HotStartClip",
+    "LatencyTrace",
+    "LatencyTracer",
+    "Pipeline",
+    "Policy",
+    "PrefetchDecoder",
+    "Presenter",
+    "PresenterWindow",
+    "ProjectionOutput",
+    "ProjectionMetrics",
+    "ProjectionWarp",
+    "RawClip",
+    "SeekIndex",
+    "Sink",
+    "Source",
+    "StubClassifier",
+    "SyntheticCapture",
+    "YoloClassifier",
+    "calibrate_corners",
+    "find_transcoded",
+    "is_stub_model",
+    "is_synthetic",
+    "open_capture",
+    "open_clip",
+    "open_prepared_clip",
+    "parse_classification",
+    "transcode_clip",
+]
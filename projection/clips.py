@@ -0,0 +1,182 @@
+"""
+Clip playback with instant restart
+- Small clips are decoded once and played from RAM
+- Large clips keep a keyframe seek index plus a "hot start" buffer of the
+  first N decoded frames: restart() plays from the buffer immediately while a
+  background thread seeks the decoder (nearest keyframe, then grab forward)
+  to frame N
+"""
+
+import bisect
+import logging
+import shutil
+import subprocess
+import threading
+
+import cv2
+
+
+class SeekIndex:
+    """Keyframe positions (frame numbers) of a clip"""
+
+    def __init__(self, keyframes):
+        self.keyframes = sorted(set(keyframes)) or [0]
+        if self.keyframes[0] != 0:
+            self.keyframes.insert(0, 0)
+
+    @classmethod
+    def build(cls, path, fps):
+        """Probe keyframe timestamps with ffprobe; falls back to [0] if unavailable"""
+        ffprobe = shutil.which("ffprobe")
+        if ffprobe is None or not fps:
+            logging.debug(f"No ffprobe/FPS for {path}, seek index has frame 0 only")
+            return cls([0])
+
+        cmd = [ffprobe, '-v', 'error', '-select_streams', 'v:0', '-skip_frame', 'nokey',
+               '-show_entries', 'frame=pts_time', '-of', 'csv=p=0', path]
+        try:
+            result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
+        except (OSError, subprocess.TimeoutExpired) as e:
+            logging.warning(f"⚠️  ffprobe failed for {path}: {e}")
+            return cls([0])
+
+        keyframes = []
+        for line in result.stdout.splitlines():
+            try:
+                keyframes.append(int(round(float(line.strip().rstrip(',')) * fps)))
+            except ValueError:
+                continue
+        return cls(keyframes)
+
+    def keyframe_before(self, frame):
+        """Closest keyframe at or before a frame number"""
+        return self.keyframes[max(bisect.bisect_right(self.keyframes, frame) - 1, 0)]
+
+
+def _probe(path):
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise IOError(f"Could not open video: {path}")
+    return cap
+
+
+class CachedClip:
+    """Whole clip decoded into RAM; looping and restart are free"""
+
+    def __init__(self, path):
+        self.path = path
+        cap = _probe(path)
+        try:
+            self.fps = cap.get(cv2.CAP_PROP_FPS)
+            self.frames = []
+            while True:
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                self.frames.append(frame)
+        finally:
+            cap.release()
+        if not self.frames:
+            raise IOError(f"No frames decoded from video: {path}")
+        self.height, self.width = self.frames[0].shape[:2]
+        self._position = 0
+
+    def read(self):
+        frame = self.frames[self._position]
+        self._position = (self._position + 1) % len(self.frames)
+        return frame
+
+    def restart(self):
+        self._position = 0
+
+    def release(self):
+        self.frames = []
+
+
+class HotStartClip:
+    """Streamed clip with a hot-start buffer and background catch-up seek"""
+
+    def __init__(self, path, hot_frames=30, index=None):
+        self.path = path
+        self.cap = _probe(path)
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS)
+        self.width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        self.height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        self.index = index if index is not None else SeekIndex.build(path, self.fps)
+
+        # Decode the hot-start buffer; the decoder is then already at frame N
+        self.hot = []
+        for _ in range(hot_frames):
+            ret, frame = self.cap.read()
+            if not ret:
+                break
+            self.hot.append(frame)
+        if not self.hot:
+            raise IOError(f"No frames decoded from video: {path}")
+
+        self._lock = threading.Lock()
+        self._caught_up = threading.Event()
+        self._caught_up.set()
+        self._generation = 0
+        self._position = 0
+
+    def read(self):
+        if self._position < len(self.hot):
+            frame = self.hot[self._position]
+            self._position += 1
+            return frame
+
+        # Hot buffer exhausted: the background seek is normally long finished
+        self._caught_up.wait()
+        with self._lock:
+            ret, frame = self.cap.read()
+        if not ret:  # End of clip: loop via the hot buffer
+            self.restart()
+            return self.read()
+        self._position += 1
+        return frame
+
+    def restart(self):
+        """Restart from frame 0 instantly; the decoder catches up in the background"""
+        self._position = 0
+        self._caught_up.clear()
+        self._generation += 1
+        threading.Thread(target=self._seek, args=(self._generation,), daemon=True).start()
+
+    def _seek(self, generation):
+        target = len(self.hot)
+        with self._lock:
+            if generation != self._generation:
+                return  # A newer restart owns the decoder
+            keyframe = self.index.keyframe_before(target)
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, keyframe)
+            for _ in range(target - keyframe):
+                if not self.cap.grab():
+                    break
+            if generation == self._generation:
+                self._caught_up.set()
+
+    def release(self):
+        with self._lock:
+            self.cap.release()
+
+
+def open_clip(path, hot_frames=30, cache_budget_mb=256, index=None):
+    """Open a clip fully cached if it fits the RAM budget, else with hot start (and `index`, if known)"""
+    cap = _probe(path)
+    try:
+        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    finally:
+        cap.release()
+
+    size_mb = frame_count * width * height * 3 / (1024 * 1024)
+    if 0 < size_mb <= cache_budget_mb:
+        clip = CachedClip(path)
+        logging.info(f"✓ Cached {path} in RAM ({len(clip.frames)} frames, {size_mb:.0f} MB)")
+    else:
+        clip = HotStartClip(path, hot_frames=hot_frames, index=index)
+        logging.info(f"✓ Streaming {path} ({size_mb:.0f} MB > {cache_budget_mb} MB budget, "
+                     f"{len(clip.hot)} hot-start frames, {len(clip.index.keyframes)} keyframes indexed)")
+    return clip
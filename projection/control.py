@@ -0,0 +1,312 @@
+"""
+Live metrics and control endpoint for the projection loop
+- Prometheus text metrics: stage latencies, FPS, skipped frames, triggers, state
+- Live settings changes (threshold, scare duration, debug/production mode)
+- asyncio HTTP server on a background thread, bound to localhost by default
+
+The render loop never blocks on the server: metrics are plain counters the
+loop writes without locks, and setting changes are queued by the server and
+applied by the loop between frames via apply_pending().
+"""
+
+import asyncio
+import bisect
+import json
+import logging
+import queue
+import threading
+import time
+from urllib.parse import parse_qsl, urlsplit
+
+# Latency histogram bucket upper bounds (seconds)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+
+def _parse_bool(value):
+    """Parse a bool from JSON or form values ('1', 'true', 'on', ...)"""
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in ("1", "true", "yes", "on"):
+        return True
+    if text in ("0", "false", "no", "off"):
+        return False
+    raise ValueError(f"expected a boolean, got {value!r}")
+
+
+def _parse_threshold(value):
+    threshold = float(value)
+    if not 0.0 <= threshold <= 1.0:
+        raise ValueError("confidence_threshold must be between 0 and 1")
+    return threshold
+
+
+def _parse_duration(value):
+    duration = float(value)
+    if duration <= 0:
+        raise ValueError("scare_duration must be positive")
+    return duration
+
+
+# Settings that can be changed live, with their parsers
+CONTROL_SETTINGS = {
+    "confidence_threshold": _parse_threshold,
+    "scare_duration": _parse_duration,
+    "debug_mode": _parse_bool,
+    "production_mode": _parse_bool,
+}
+
+
+class ProjectionMetrics:
+    """Counters and latency histograms written by the render loop"""
+
+    def __init__(self):
+        self.stage_buckets = {}   # stage -> per-bucket counts (last slot = +Inf)
+        self.stage_sums = {}      # stage -> total seconds
+        self.frames = 0
+        self.skipped = {}         # reason -> count
+        self.triggers = 0
+        self.state = "idle"
+        self.fps = 0.0
+        self.started = time.time()
+        self._last_frame_time = None
+        self._sources = []
+
+    def observe(self, stage, seconds):
+        """Record one latency sample for a pipeline stage"""
+        buckets = self.stage_buckets.get(stage)
+        if buckets is None:
+            buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+            self.stage_buckets[stage] = buckets
+            self.stage_sums[stage] = 0.0
+        buckets[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.stage_sums[stage] += seconds
+
+    def frame_done(self, now=None):
+        """Count a finished frame and update the smoothed FPS"""
+        now = time.perf_counter() if now is None else now
+        if self._last_frame_time is not None:
+            interval = now - self._last_frame_time
+            if interval > 0:
+                instant = 1.0 / interval
+                self.fps = instant if self.fps == 0.0 else 0.9 * self.fps + 0.1 * instant
+        self._last_frame_time = now
+        self.frames += 1
+
+    def skip(self, reason):
+        """Count a frame that was dropped before display"""
+        self.skipped[reason] = self.skipped.get(reason, 0) + 1
+
+    def trigger(self):
+        """Count an idle → scare transition"""
+        self.triggers += 1
+
+    def set_state(self, state):
+        self.state = state
+
+    def add_source(self, source):
+        """Register a callable returning {name: value} gauges read at scrape time"""
+        self._sources.append(source)
+
+    def render(self):
+        """Render all metrics in Prometheus text exposition format"""
+        lines = [
+            "# HELP projection_stage_seconds Per-frame latency of each pipeline stage",
+            "# TYPE projection_stage_seconds histogram",
+        ]
+        for stage, buckets in list(self.stage_buckets.items()):
+            buckets = list(buckets)
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS, buckets):
+                cumulative += count
+                lines.append(f'projection_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+            cumulative += buckets[-1]
+            lines.append(f'projection_stage_seconds_bucket{{stage="{stage}",le="+Inf"}} {cumulative}')
+            lines.append(f'projection_stage_seconds_sum{{stage="{stage}"}} {self.stage_sums.get(stage, 0.0):.6f}')
+            lines.append(f'projection_stage_seconds_count{{stage="{stage}"}} {cumulative}')
+
+        lines += [
+            "# HELP projection_fps Smoothed frames per second of the render loop",
+            "# TYPE projection_fps gauge",
+            f"projection_fps {self.fps:.2f}",
+            "# HELP projection_frames_total Frames processed by the render loop",
+            "# TYPE projection_frames_total counter",
+            f"projection_frames_total {self.frames}",
+            "# HELP projection_skipped_frames_total Frames dropped before display",
+            "# TYPE projection_skipped_frames_total counter",
+        ]
+        for reason, count in list(self.skipped.items()):
+            lines.append(f'projection_skipped_frames_total{{reason="{reason}"}} {count}')
+
+        lines += [
+            "# HELP projection_triggers_total Idle to scare transitions",
+            "# TYPE projection_triggers_total counter",
+            f"projection_triggers_total {self.triggers}",
+            "# HELP projection_state Current state (1 = active)",
+            "# TYPE projection_state gauge",
+        ]
+        for state in ("idle", "scare"):
+            lines.append(f'projection_state{{state="{state}"}} {1 if self.state == state else 0}')
+
+        lines += [
+            "# HELP projection_uptime_seconds Seconds since the metrics were created",
+            "# TYPE projection_uptime_seconds gauge",
+            f"projection_uptime_seconds {time.time() - self.started:.1f}",
+        ]
+
+        for source in self._sources:
+            try:
+                values = source()
+            except Exception as e:
+                logging.debug(f"Metrics source failed: {e}")
+                continue
+            for name, value in values.items():
+                lines.append(f"# TYPE projection_{name} gauge")
+                lines.append(f"projection_{name} {float(value):g}")
+
+        return "\n".join(lines) + "\n"
+
+
+class ControlServer:
+    """Local HTTP endpoint serving /metrics and accepting /control changes"""
+
+    def __init__(self, metrics, host="127.0.0.1", port=8765, settings=None, allowed=None):
+        """
+        Args:
+            metrics: ProjectionMetrics to serve on /metrics
+            host: Interface to bind (keep on localhost unless the network is trusted)
+            port: TCP port
+            settings: Optional callable returning the current settings dict for GET /control
+            allowed: Names from CONTROL_SETTINGS this entry point supports (None = all);
+                POSTs naming any other setting are rejected
+        """
+        allowed = list(CONTROL_SETTINGS) if allowed is None else list(allowed)
+        unknown = [name for name in allowed if name not in CONTROL_SETTINGS]
+        if unknown:
+            raise ValueError(f"Unknown control settings: {', '.join(unknown)}")
+        self.metrics = metrics
+        self.host = host
+        self.port = port
+        self.settings = settings
+        self.allowed = allowed
+        self.pending = queue.SimpleQueue()
+        self._thread = None
+        self._loop = None
+        self._stop = None
+        self._ready = threading.Event()
+        self._error = None
+
+    def start(self):
+        """Start serving on a daemon thread; returns once the socket is bound"""
+        self._thread = threading.Thread(target=self._run, name="control-server", daemon=True)
+        self._thread.start()
+        self._ready.wait(timeout=5.0)
+        if self._error is not None:
+            raise self._error
+        logging.info(f"📈 Control endpoint: http://{self.host}:{self.port}/metrics")
+
+    def stop(self):
+        if self._loop is not None and self._stop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._stop.set)  # Loop is already closed if start() failed
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+
+    def apply_pending(self, controller):
+        """Apply queued setting changes to the controller (call between frames)"""
+        applied = 0
+        while True:
+            try:
+                changes = self.pending.get_nowait()
+            except queue.Empty:
+                return applied
+            for name, value in changes.items():
+                setattr(controller, name, value)
+                logging.info(f"🎛️  Live change: {name} = {value}")
+                applied += 1
+
+    def _run(self):
+        try:
+            asyncio.run(self._serve())
+        except Exception as e:
+            self._error = e
+            self._ready.set()
+
+    async def _serve(self):
+        self._loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        server = await asyncio.start_server(self._handle, self.host, self.port)
+        self._ready.set()
+        async with server:
+            await self._stop.wait()
+
+    async def _handle(self, reader, writer):
+        try:
+            status, content_type, body = await self._dispatch(reader)
+        except Exception as e:
+            status, content_type, body = 400, "application/json", json.dumps({"error": str(e)})
+        payload = body.encode("utf-8")
+        reason = {200: "OK", 202: "Accepted", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed"}
+        header = (
+            f"HTTP/1.1 {status} {reason.get(status, 'OK')}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(payload)}\r\n"
+            "Connection: close\r\n\r\n"
+        )
+        writer.write(header.encode("ascii") + payload)
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def _dispatch(self, reader):
+        request_line = (await reader.readline()).decode("latin-1").strip()
+        if not request_line:
+            raise ValueError("empty request")
+        method, target, _ = request_line.split(" ", 2)
+
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode("latin-1").strip()
+            if not line:
+                break
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        length = int(headers.get("content-length", 0))
+        body = (await reader.readexactly(length)).decode("utf-8") if length else ""
+        url = urlsplit(target)
+
+        if url.path == "/metrics":
+            if method != "GET":
+                return 405, "text/plain", "GET only\n"
+            return 200, "text/plain; version=0.0.4", self.metrics.render()
+
+        if url.path == "/control":
+            if method == "GET":
+                current = self.settings() if self.settings else {}
+                return 200, "application/json", json.dumps(current)
+            if method != "POST":
+                return 405, "text/plain", "GET or POST only\n"
+            changes = self._parse_changes(url.query, body, headers.get("content-type", ""))
+            self.pending.put(changes)
+            return 202, "application/json", json.dumps(changes)
+
+        return 404, "text/plain", "Try /metrics or /control\n"
+
+    def _parse_changes(self, query, body, content_type):
+        """Validate requested changes from the query string and/or body"""
+        raw = dict(parse_qsl(query))
+        if body:
+            if "json" in content_type or body.lstrip().startswith("{"):
+                raw.update(json.loads(body))
+            else:
+                raw.update(parse_qsl(body))
+
+        changes = {}
+        for name, value in raw.items():
+            if name not in self.allowed:
+                raise ValueError(f"unknown setting {name!r} (expected one of {sorted(self.allowed)})")
+            changes[name] = CONTROL_SETTINGS[name](value)
+        if not changes:
+            raise ValueError("no settings given")
+        return changes
@@ -0,0 +1,154 @@
+"""
+Background prefetching decoder
+- One decoder thread per clip, filling a bounded queue of ready frames
+- Frames are prepared (resized/cropped/warped) to output resolution off the render loop
+- Looping and restart are handled by the decoder thread
+- Queue depth and underrun counters for metrics
+
+The render loop never waits on the codec: if a queue is empty, read()
+counts an underrun and repeats the last frame. Only right after a restart,
+when there is no frame to repeat, it waits up to 50 ms for frame 0 (served
+from RAM by the clip's hot-start buffer).
+"""
+
+import logging
+import queue
+import threading
+import time
+
+
+class PrefetchDecoder:
+    def __init__(self, clip, name, prepare=None, queue_size=8):
+        """
+        Args:
+            clip: Clip object with read()/restart() (see projection.clips)
+            name: Label used in logs and metrics
+            prepare: Optional callable applied to each decoded frame (e.g. resize)
+            queue_size: Maximum number of ready frames held
+        """
+        self.clip = clip
+        self.name = name
+        self.prepare = prepare
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.frames_decoded = 0
+        self.underruns = 0
+        self.decode_seconds = 0.0
+        self._generation = 0
+        self._last = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"decode-{name}", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join(timeout=1.0)
+
+    def read(self):
+        """Next ready frame, or the last frame again on underrun"""
+        while True:
+            try:
+                if self._last is None:
+                    # Just started/restarted: frame 0 comes from RAM (hot start), wait briefly for it
+                    generation, frame = self.queue.get(timeout=0.05)
+                else:
+                    generation, frame = self.queue.get_nowait()
+            except queue.Empty:
+                self.underruns += 1
+                return self._last
+            if generation == self._generation:
+                self._last = frame
+                return frame
+            # Frame decoded before the last restart: discard
+
+    def restart(self):
+        """Play from frame 0; frames already queued are discarded"""
+        self._generation += 1
+        self._last = None  # Never repeat a frame from before the restart
+        while True:
+            try:
+                self.queue.get_nowait()
+            except queue.Empty:
+                break
+
+    def wait_ready(self, timeout=2.0):
+        """Wait until at least one frame is queued"""
+        deadline = time.monotonic() + timeout
+        while self.queue.empty() and time.monotonic() < deadline:
+            time.sleep(0.005)
+        return not self.queue.empty()
+
+    def _run(self):
+        generation = 0
+        while not self._stop.is_set():
+            if generation != self._generation:
+                generation = self._generation
+                self.clip.restart()
+
+            start = time.perf_counter()
+            try:
+                frame = self.clip.read()
+                if frame is not None and self.prepare is not None:
+                    frame = self.prepare(frame)
+            except Exception as e:
+                logging.error(f"❌ Decoder {self.name} failed: {e}")
+                time.sleep(0.1)
+                continue
+            self.decode_seconds += time.perf_counter() - start
+            if frame is None:
+                continue
+            self.frames_decoded += 1
+
+            # Bounded queue: block while full, but stay responsive to restart/stop
+            while not self._stop.is_set() and generation == self._generation:
+                try:
+                    self.queue.put((generation, frame), timeout=0.05)
+                    break
+                except queue.Full:
+                    continue
+
+
+class DecodeEngine:
+    """Runs a PrefetchDecoder per clip"""
+
+    def __init__(self, clips, prepare=None, queue_size=8):
+        """
+        Args:
+            clips: {name: clip}
+            prepare: Callable applied to each frame in the decoder threads
+            queue_size: Ready frames held per clip
+        """
+        self.decoders = {
+            name: PrefetchDecoder(clip, name, prepare=prepare, queue_size=queue_size)
+            for name, clip in clips.items()
+        }
+
+    def start(self, wait=True):
+        for decoder in self.decoders.values():
+            decoder.start()
+        if wait:
+            for decoder in self.decoders.values():
+                if not decoder.wait_ready():
+                    logging.warning(f"⚠️  Decoder {decoder.name} has no frames ready yet")
+        logging.info(f"✅ Prefetch decoders running: {', '.join(self.decoders)}")
+
+    def read(self, name):
+        return self.decoders[name].read()
+
+    def restart(self, name):
+        self.decoders[name].restart()
+
+    def stop(self):
+        for decoder in self.decoders.values():
+            decoder.stop()
+
+    def stats(self):
+        """Queue depth, underrun and decode counters for metrics"""
+        values = {}
+        for name, decoder in self.decoders.items():
+            values[f"decode_queue_depth_{name}"] = decoder.queue.qsize()
+            values[f"decode_underruns_{name}"] = decoder.underruns
+            values[f"decode_frames_{name}"] = decoder.frames_decoded
+            values[f"decode_seconds_{name}"] = decoder.decode_seconds
+        return values
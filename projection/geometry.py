@@ -0,0 +1,254 @@
+"""
+Projection geometry: keystone / surface mapping with precomputed remap tables
+- Calibrate once (4-corner homography or a coarse mesh warp)
+- Build fixed-point cv2.remap maps per source size and cache them to disk
+- Warp each frame with a single remap pass into a small ring of reused
+  output buffers (no per-frame allocation or copy)
+
+Calibration files are JSON, with coordinates normalized to 0..1:
+
+    {"output_size": [1920, 1080],
+     "corners": [[x, y], [x, y], [x, y], [x, y]]}   # TL, TR, BR, BL
+
+`corners` say where the video's corners land on the output. Values outside
+0..1 are allowed, e.g. the old production stretch is roughly
+[[0, -0.05], [1, -0.05], [1, 1.05], [0, 1.05]].
+
+    {"output_size": [1920, 1080],
+     "mesh": [[[u, v], ...], ...]}                   # rows x cols
+
+`mesh` gives, for a regular grid of output points, which source point is
+shown there (bilinear between nodes), for curved or angled surfaces.
+"""
+
+import hashlib
+import json
+import logging
+import os
+
+import cv2
+import numpy as np
+
+DEFAULT_CORNERS = [[0.0, 0.0], [1.0, 0.0], [1.0, 1.0], [0.0, 1.0]]
+DEFAULT_RING_SIZE = 3  # Output buffers in flight: being rendered, waiting in the mailbox, on screen
+
+
+class ProjectionWarp:
+    def __init__(self, output_size=None, corners=None, mesh=None, cache_dir=".warp_cache",
+                 ring_size=DEFAULT_RING_SIZE):
+        """
+        Args:
+            output_size: (width, height) of the projector output, or None to set later
+            corners: 4 normalized output points for the source TL, TR, BR, BL corners
+            mesh: rows x cols x 2 normalized source points on a regular output grid
+            cache_dir: Directory for cached remap tables (None = memory only)
+            ring_size: Output buffers apply() cycles through; a returned frame
+                stays intact for ring_size - 1 further calls
+        """
+        if corners is not None and mesh is not None:
+            raise ValueError("Use either corners or mesh, not both")
+        if mesh is not None:
+            mesh = np.asarray(mesh, dtype=np.float32)
+            if mesh.ndim != 3 or mesh.shape[2] != 2 or min(mesh.shape[:2]) < 2:
+                raise ValueError("mesh must be rows x cols x 2 with at least 2x2 nodes")
+        else:
+            corners = np.asarray(corners if corners is not None else DEFAULT_CORNERS, dtype=np.float32)
+            if corners.shape != (4, 2):
+                raise ValueError("corners must be 4 [x, y] points (TL, TR, BR, BL)")
+
+        self.output_size = tuple(output_size) if output_size else None
+        self.corners = corners
+        self.mesh = mesh
+        self.cache_dir = cache_dir
+        self.ring_size = max(1, ring_size)
+        self._maps = {}
+        self._ring = []
+        self._ring_index = 0
+
+    @classmethod
+    def from_file(cls, path, cache_dir=".warp_cache"):
+        """Load a calibration JSON file"""
+        with open(path) as f:
+            data = json.load(f)
+        return cls(
+            output_size=data.get("output_size"),
+            corners=data.get("corners"),
+            mesh=data.get("mesh"),
+            cache_dir=cache_dir,
+        )
+
+    def save(self, path):
+        """Write the calibration as JSON"""
+        data = {"output_size": list(self.output_size) if self.output_size else None}
+        if self.mesh is not None:
+            data["mesh"] = self.mesh.tolist()
+        else:
+            data["corners"] = self.corners.tolist()
+        with open(path, "w") as f:
+            json.dump(data, f, indent=2)
+        logging.info(f"💾 Warp calibration saved: {path}")
+
+    def apply(self, frame, out=None):
+        """
+        Warp a frame to the output in one remap pass
+
+        Args:
+            frame: Source frame
+            out: Buffer to write into (e.g. a fresh array for frames queued by a
+                decoder thread); None uses the next buffer of the warp's ring,
+                which is overwritten again ring_size calls later
+        """
+        src_h, src_w = frame.shape[:2]
+        map1, map2 = self.maps_for(src_w, src_h)
+
+        if out is None:
+            out = self._next_buffer(frame)
+        cv2.remap(frame, map1, map2, cv2.INTER_LINEAR, dst=out,
+                  borderMode=cv2.BORDER_CONSTANT, borderValue=0)
+        return out
+
+    def new_buffer(self, frame):
+        """Freshly allocated output buffer for source frames like this one"""
+        out_w, out_h = self.output_size
+        return np.empty((out_h, out_w) + frame.shape[2:], dtype=frame.dtype)
+
+    def _next_buffer(self, frame):
+        """Oldest buffer of the ring (allocated on first use or when the output format changes)"""
+        out_w, out_h = self.output_size
+        shape = (out_h, out_w) + frame.shape[2:]
+        if self._ring and (self._ring[0].shape != shape or self._ring[0].dtype != frame.dtype):
+            self._ring = []
+            self._ring_index = 0
+        if len(self._ring) < self.ring_size:
+            self._ring.append(self.new_buffer(frame))
+            return self._ring[-1]
+        out = self._ring[self._ring_index]
+        self._ring_index = (self._ring_index + 1) % self.ring_size
+        return out
+
+    def maps_for(self, src_w, src_h):
+        """Fixed-point remap tables for a source size (memory → disk cache → build)"""
+        if self.output_size is None:
+            raise ValueError("output_size must be set before warping")
+        key = self._cache_key(src_w, src_h)
+        maps = self._maps.get(key)
+        if maps is not None:
+            return maps
+
+        cache_path = os.path.join(self.cache_dir, f"warp_{key}.npz") if self.cache_dir else None
+        if cache_path and os.path.exists(cache_path):
+            try:
+                with np.load(cache_path) as cached:
+                    maps = (cached["map1"], cached["map2"])
+                logging.info(f"✓ Loaded cached warp maps: {cache_path}")
+            except Exception as e:
+                logging.warning(f"⚠️  Ignoring unreadable warp cache {cache_path}: {e}")
+
+        if maps is None:
+            map_x, map_y = self._build_float_maps(src_w, src_h)
+            maps = cv2.convertMaps(map_x, map_y, cv2.CV_16SC2)
+            if cache_path:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                np.savez(cache_path, map1=maps[0], map2=maps[1])
+                logging.info(f"💾 Cached warp maps: {cache_path}")
+
+        self._maps[key] = maps
+        return maps
+
+    def _cache_key(self, src_w, src_h):
+        geometry = self.mesh if self.mesh is not None else self.corners
+        digest = hashlib.sha1()
+        digest.update(b"mesh" if self.mesh is not None else b"corners")
+        digest.update(np.ascontiguousarray(geometry, dtype=np.float32).tobytes())
+        digest.update(f"{src_w}x{src_h}->{self.output_size[0]}x{self.output_size[1]}".encode())
+        return digest.hexdigest()[:16]
+
+    def _build_float_maps(self, src_w, src_h):
+        """Source coordinates (float32) for every output pixel"""
+        out_w, out_h = self.output_size
+        xs = np.arange(out_w, dtype=np.float32)
+        ys = np.arange(out_h, dtype=np.float32)
+
+        if self.mesh is not None:
+            # Sample the coarse mesh bilinearly at every output pixel
+            rows, cols = self.mesh.shape[:2]
+            grid_x = np.tile(xs * (cols - 1) / max(out_w - 1, 1), (out_h, 1))
+            grid_y = np.tile((ys * (rows - 1) / max(out_h - 1, 1))[:, None], (1, out_w))
+            mesh_x = np.ascontiguousarray(self.mesh[:, :, 0] * (src_w - 1))
+            mesh_y = np.ascontiguousarray(self.mesh[:, :, 1] * (src_h - 1))
+            map_x = cv2.remap(mesh_x, grid_x, grid_y, cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+            map_y = cv2.remap(mesh_y, grid_x, grid_y, cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+            return map_x, map_y
+
+        # Homography from source rectangle to output quad, inverted per output pixel
+        src = np.float32([[0, 0], [src_w - 1, 0], [src_w - 1, src_h - 1], [0, src_h - 1]])
+        dst = (self.corners * np.float32([out_w - 1, out_h - 1])).astype(np.float32)
+        inverse = np.linalg.inv(cv2.getPerspectiveTransform(src, dst))
+
+        grid_x, grid_y = np.meshgrid(xs, ys)
+        u = inverse[0, 0] * grid_x + inverse[0, 1] * grid_y + inverse[0, 2]
+        v = inverse[1, 0] * grid_x + inverse[1, 1] * grid_y + inverse[1, 2]
+        w = inverse[2, 0] * grid_x + inverse[2, 1] * grid_y + inverse[2, 2]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            map_x = np.where(w > 0, u / w, -1).astype(np.float32)
+            map_y = np.where(w > 0, v / w, -1).astype(np.float32)
+        return map_x, map_y
+
+
+def _test_pattern(width, height):
+    """Grid pattern used while calibrating"""
+    pattern = np.zeros((height, width, 3), dtype=np.uint8)
+    step = max(width, height) // 16
+    for x in range(0, width, step):
+        cv2.line(pattern, (x, 0), (x, height - 1), (0, 165, 255), 1)
+    for y in range(0, height, step):
+        cv2.line(pattern, (0, y), (width - 1, y), (0, 165, 255), 1)
+    cv2.rectangle(pattern, (0, 0), (width - 1, height - 1), (255, 255, 255), 4)
+    cv2.circle(pattern, (width // 2, height // 2), step, (255, 255, 255), 2)
+    return pattern
+
+
+def calibrate_corners(window_name, output_size, source_frame=None, cache_dir=".warp_cache"):
+    """
+    Interactive 4-corner calibration on the projector window
+
+    Click where the image's top-left, top-right, bottom-right and bottom-left
+    corners should land. ENTER accepts, R resets, ESC cancels.
+
+    Returns:
+        ProjectionWarp, or None if cancelled
+    """
+    out_w, out_h = output_size
+    source = source_frame if source_frame is not None else _test_pattern(out_w, out_h)
+    clicks = []
+
+    def on_mouse(event, x, y, flags, param):
+        if event == cv2.EVENT_LBUTTONDOWN and len(clicks) < 4:
+            clicks.append([x / max(out_w - 1, 1), y / max(out_h - 1, 1)])
+
+    cv2.setMouseCallback(window_name, on_mouse)
+    labels = ["top-left", "top-right", "bottom-right", "bottom-left"]
+    logging.info("📐 Warp calibration: click TL, TR, BR, BL corners - ENTER=accept, R=reset, ESC=cancel")
+
+    try:
+        while True:
+            if len(clicks) == 4:
+                preview = ProjectionWarp(output_size, corners=clicks, cache_dir=None).apply(source).copy()
+            else:
+                preview = cv2.resize(source, (out_w, out_h))
+                cv2.putText(preview, f"Click {labels[len(clicks)]} corner", (20, 50),
+                            cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 255, 255), 3)
+            for x, y in clicks:
+                cv2.circle(preview, (int(x * (out_w - 1)), int(y * (out_h - 1))), 8, (0, 0, 255), -1)
+            cv2.imshow(window_name, preview)
+
+            key = cv2.waitKey(20) & 0xFF
+            if key == 27:
+                logging.info("Warp calibration cancelled")
+                return None
+            if key in [ord('r'), ord('R')]:
+                clicks.clear()
+            elif key in [13, 10] and len(clicks) == 4:
+                return ProjectionWarp(output_size, corners=clicks, cache_dir=cache_dir)
+    finally:
+        cv2.setMouseCallback(window_name, lambda *args: None)
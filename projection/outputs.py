@@ -0,0 +1,165 @@
+"""
+Multi-output fan-out: one decoded video frame, several displays
+- Each output has its own resolution, crop, optional warp and mode
+- The grey-border fix and production stretch are folded into the source
+  crop, so every output is scaled exactly once per frame (one resize or
+  one remap, into reused buffers)
+- Outputs are described on the command line as comma-separated key=value
+  specs:
+
+    --output "name=projector,size=1920x1080,warp=projector.json,fullscreen=1"
+    --output "name=hallway,size=1280x720,mode=debug,crop=0:0.1:1:0.8"
+
+Keys: name, size (WxH, default camera size), mode (auto|clean|debug|production,
+auto follows the D/P keys), crop (x:y:w:h fractions of the video frame),
+warp (calibration JSON) and fullscreen.
+"""
+
+import cv2
+
+from .geometry import ProjectionWarp
+
+MODES = ("auto", "clean", "debug", "production")
+GREY_FIX_EXTRA_HEIGHT = 0.15  # Keep the top 1/1.15 of the frame (hides the grey top border)
+PRODUCTION_STRETCH = 0.10     # Production mode: a further 10% taller, centred
+
+
+class ProjectionOutput:
+    def __init__(self, name, size=None, mode="auto", crop=None, warp=None, fullscreen=False):
+        """
+        Args:
+            name: Output label (window title suffix, metrics stage name)
+            size: (width, height), or None to use the camera resolution
+            mode: "auto" (follow the controller), "clean", "debug" or "production"
+            crop: (x, y, w, h) fractions of the video frame to show, or None for all
+            warp: ProjectionWarp replacing the grey-border fix, or None
+            fullscreen: Start this output's window fullscreen
+        """
+        if mode not in MODES:
+            raise ValueError(f"Unknown output mode {mode!r} (expected one of {', '.join(MODES)})")
+        if crop is not None:
+            x, y, w, h = crop
+            if w <= 0 or h <= 0 or x < 0 or y < 0 or x + w > 1.0 + 1e-6 or y + h > 1.0 + 1e-6:
+                raise ValueError(f"Crop {crop} must lie within 0..1")
+        self.name = name
+        self.size = tuple(size) if size else None
+        self.mode = mode
+        self.crop = tuple(crop) if crop else None
+        self.warp = warp
+        self.fullscreen = fullscreen
+        self.window_name = None  # Assigned when the output is attached to a presenter
+
+    @classmethod
+    def from_spec(cls, spec, default_name="output", warp_cache=".warp_cache"):
+        """Parse 'name=...,size=WxH,mode=...,crop=x:y:w:h,warp=FILE,fullscreen=1'"""
+        kwargs = {"name": default_name}
+        for item in filter(None, (part.strip() for part in spec.split(","))):
+            key, sep, value = item.partition("=")
+            if not sep:
+                raise ValueError(f"Expected key=value in output spec, got {item!r}")
+            if key == "name":
+                kwargs["name"] = value
+            elif key == "size":
+                width, height = value.lower().split("x")
+                kwargs["size"] = (int(width), int(height))
+            elif key == "mode":
+                kwargs["mode"] = value
+            elif key == "crop":
+                kwargs["crop"] = tuple(float(v) for v in value.split(":"))
+                if len(kwargs["crop"]) != 4:
+                    raise ValueError(f"Crop needs x:y:w:h, got {value!r}")
+            elif key == "warp":
+                kwargs["warp"] = ProjectionWarp.from_file(value, cache_dir=warp_cache)
+            elif key == "fullscreen":
+                kwargs["fullscreen"] = value.lower() not in ("0", "false", "no")
+            else:
+                raise ValueError(f"Unknown output option {key!r}")
+        return cls(**kwargs)
+
+    def resolve(self, camera_size):
+        """Fill in defaults that depend on the camera (call once the first frame is known)"""
+        if self.size is None:
+            warp_size = self.warp.output_size if self.warp is not None else None
+            self.size = tuple(warp_size or camera_size)
+        if self.warp is not None and self.warp.output_size is None:
+            self.warp.output_size = self.size
+
+    def effective_mode(self, debug=False, production=False):
+        """
+        (debug, production) for this output given the controller's D/P toggles
+
+        'auto' follows the toggles, with debug taking precedence as it always
+        has: the production stretch is never applied under the debug overlay.
+        """
+        if self.mode == "auto":
+            return debug, production and not debug
+        return self.mode == "debug", self.mode == "production"
+
+    def native_source_size(self, camera_size=None):
+        """Video frame size this output shows without resampling (clip transcode target)"""
+        warp_size = self.warp.output_size if self.warp is not None else None
+        width, height = self.size or warp_size or camera_size
+        _, _, w, h = self.crop or (0.0, 0.0, 1.0, 1.0)
+        if self.warp is None:
+            height *= 1.0 + GREY_FIX_EXTRA_HEIGHT
+        return int(round(width / w)), int(round(height / h))
+
+    def source_rect(self, src_w, src_h, production=False):
+        """(x, y, w, h) pixels of the video frame this output shows"""
+        x, y, w, h = self.crop or (0.0, 0.0, 1.0, 1.0)
+        x0, y0 = int(round(x * src_w)), int(round(y * src_h))
+        width, height = max(1, int(round(w * src_w))), max(1, int(round(h * src_h)))
+        if self.warp is None:
+            # Same rows the old stretch-and-crop kept (15% taller, top rows; production: 10% more, centred)
+            height = max(1, int(round(height / (1.0 + GREY_FIX_EXTRA_HEIGHT))))
+            if production:
+                kept = max(1, int(round(height / (1.0 + PRODUCTION_STRETCH))))
+                y0 += (height - kept) // 2
+                height = kept
+        return x0, y0, width, height
+
+    def prepare_maps(self, src_w, src_h):
+        """Precompute warp maps for a clip of this size"""
+        if self.warp is not None:
+            _, _, width, height = self.source_rect(src_w, src_h)
+            self.warp.maps_for(width, height)
+
+    def scale(self, video_frame, production=False, fresh=False):
+        """
+        Crop and scale (or warp) a video frame to this output in a single pass
+
+        Warped frames land in the warp's buffer ring unless fresh is set (frames
+        queued by decoder threads must not be overwritten by later calls).
+        """
+        src_h, src_w = video_frame.shape[:2]
+        x, y, width, height = self.source_rect(src_w, src_h, production)
+        region = video_frame[y:y + height, x:x + width]
+        if self.warp is not None:
+            return self.warp.apply(region, self.warp.new_buffer(region) if fresh else None)
+        if (width, height) == self.size:
+            return region
+        return cv2.resize(region, self.size, interpolation=cv2.INTER_LINEAR)
+
+    def render(self, video_frame, debug=False, production=False, overlay=None, prepared=False):
+        """
+        Final frame for this output
+
+        Args:
+            video_frame: Shared decoded frame (or already scaled, if prepared)
+            debug: Draw the debug overlay
+            production: Apply the production stretch (ignored with a warp)
+            overlay: Callable drawing the debug overlay in place on the output frame
+            prepared: video_frame was already scaled for this output by the decoder
+
+        The result can be handed to the presenter as is: warped frames come
+        from the warp's buffer ring, and debug overlays are only drawn in place
+        on frames nothing else holds (otherwise on a copy).
+        """
+        frame = video_frame if prepared else self.scale(video_frame, production)
+        if debug and overlay is not None:
+            # Decoder frames and uncropped regions are shared; resize() and warp ring buffers are ours
+            shared = prepared or (self.warp is None and (frame.base is not None or frame is video_frame))
+            if shared:
+                frame = frame.copy()
+            overlay(frame)
+        return frame
@@ -0,0 +1,307 @@
+"""
+Shared capture → classify → decide → output pipeline
+- Pluggable stages: Source, Classifier, Policy, Sink
+- One YOLO classification parsing path for every entry point
+- Stage-level timing recorded into ProjectionMetrics
+- Backpressure: threaded sources keep only the newest camera frame, so a slow
+  classifier or sink drops stale frames (counted) instead of building latency
+- Optional capture-to-projection tracing of every trigger (see tracing.py)
+
+Both simple_projection.py (OpenCV output) and scripts/yolo_vlc_projection.py
+(VLC output) are built on this module.
+"""
+
+import logging
+import threading
+import time
+
+from .control import ProjectionMetrics
+
+
+def parse_classification(result, names=None):
+    """
+    Top-1 class name and confidence from a YOLO classification result
+
+    Uses probs.top1/top1conf so only two scalars leave the device, rather
+    than copying the full probability tensor.
+
+    Returns:
+        (class_name, confidence); ("not_hand", 0.0) for non-classification results
+    """
+    probs = getattr(result, 'probs', None)
+    if probs is None:
+        return "not_hand", 0.0
+    names = names if names is not None else result.names
+    return names[int(probs.top1)], float(probs.top1conf)
+
+
+class FramePacket:
+    """One camera frame and everything decided about it"""
+
+    def __init__(self, index, frame, captured_at):
+        self.index = index
+        self.frame = frame
+        self.captured_at = captured_at  # time.perf_counter() at capture
+        self.read_at = captured_at      # ...when the pipeline picked it up
+        self.inferred_at = None         # ...after classification
+        self.decided_at = None          # ...after the decision (the switch to scare, if triggered)
+        self.class_name = "not_hand"
+        self.confidence = 0.0
+        self.state = "idle"
+        self.triggered = False
+        self.trace = None               # LatencyTrace if this packet triggered and tracing is on
+
+
+class Source:
+    """Produces camera frames"""
+
+    def read(self):
+        """(frame, captured_at) or (None, None) if no frame was available"""
+        raise NotImplementedError
+
+    def release(self):
+        pass
+
+
+class Classifier:
+    """Turns a frame into (class_name, confidence)"""
+
+    def classify(self, frame):
+        raise NotImplementedError
+
+
+class Policy:
+    """Decides state from classifications"""
+
+    state = "idle"
+
+    def update(self, class_name, confidence, now=None):
+        """Update state; returns True when this call triggered a scare"""
+        raise NotImplementedError
+
+
+class Sink:
+    """Consumes finished packets (display, playback, logging...)"""
+
+    name = "sink"
+
+    def consume(self, packet):
+        """Handle a packet; return False to stop the pipeline"""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class CameraSource(Source):
+    def __init__(self, cap, threaded=False, retry_delay=0.01):
+        """
+        Args:
+            cap: Opened cv2.VideoCapture
+            threaded: Grab continuously on a background thread and keep only the
+                newest frame (live cameras); False reads every frame in order (files)
+            retry_delay: Seconds the grab thread waits after a failed read
+        """
+        self.cap = cap
+        self.threaded = threaded
+        self.retry_delay = retry_delay
+        self.dropped = 0
+        self._cond = threading.Condition()
+        self._slot = (None, None)
+        self._fresh = False
+        self._running = threaded
+        if threaded:
+            self._thread = threading.Thread(target=self._grab_loop, name="camera-grab", daemon=True)
+            self._thread.start()
+
+    def read(self):
+        if not self.threaded:
+            ret, frame = self.cap.read()
+            return (frame, time.perf_counter()) if ret else (None, None)
+
+        with self._cond:
+            if not self._fresh:
+                self._cond.wait(timeout=1.0)
+            if not self._fresh:
+                return None, None
+            self._fresh = False
+            return self._slot
+
+    def _grab_loop(self):
+        while self._running:
+            ret, frame = self.cap.read()
+            captured_at = time.perf_counter()
+            with self._cond:
+                if self._fresh:
+                    self.dropped += 1  # Consumer never saw the previous frame
+                self._slot = (frame, captured_at) if ret else (None, None)
+                self._fresh = True
+                self._cond.notify()
+            if not ret:
+                time.sleep(self.retry_delay)
+
+    def release(self):
+        if self.threaded:
+            self._running = False
+            self._thread.join(timeout=1.0)
+        self.cap.release()
+
+
+class YoloClassifier(Classifier):
+    def __init__(self, model, **predict_kwargs):
+        self.model = model
+        self.names = model.names
+        self.predict_kwargs = {'verbose': False, **predict_kwargs}
+
+    def classify(self, frame):
+        results = self.model.predict(frame, **self.predict_kwargs)
+        if not results:
+            return "not_hand", 0.0
+        return parse_classification(results[0], self.names)
+
+
+class HandTriggerPolicy(Policy):
+    """idle → scare on a confident 'hand', back to idle after scare_duration"""
+
+    def __init__(self, confidence_threshold=0.7, scare_duration=2.0, debounce_time=0.0):
+        self.state = "idle"
+        self.confidence_threshold = confidence_threshold
+        self.scare_duration = scare_duration
+        self.debounce_time = debounce_time  # Minimum time between state changes
+        self.last_trigger = 0.0
+        self.last_state_change = 0.0
+        self.triggered_at = None  # time.perf_counter() of the last switch to scare, before on_scare()
+
+    def update(self, class_name, confidence, now=None):
+        now = time.time() if now is None else now
+        settled = (now - self.last_state_change) >= self.debounce_time
+
+        if class_name == 'hand' and confidence >= self.confidence_threshold and self.state != "scare":
+            if settled:
+                logging.info(f"🖐️  HAND DETECTED! Confidence: {confidence:.1%}")
+                logging.info("   → Switching to SCARE state")
+                self.state = "scare"
+                self.last_trigger = now
+                self.last_state_change = now
+                self.triggered_at = time.perf_counter()
+                self.on_scare()
+                return True
+
+        # Check for scare timeout
+        elif self.state == "scare" and now - self.last_trigger > self.scare_duration and settled:
+            logging.info("   → SCARE timeout, returning to IDLE")
+            self.state = "idle"
+            self.last_state_change = now
+            self.on_idle()
+
+        return False
+
+    def on_scare(self):
+        """Hook called after switching to scare"""
+
+    def on_idle(self):
+        """Hook called after returning to idle"""
+
+
+class Pipeline:
+    def __init__(self, source, classifier, policy, sinks, metrics=None,
+                 before_frame=None, max_failures=None, retry_delay=0.01, log_every=0, log_level=logging.INFO,
+                 tracer=None):
+        """
+        Args:
+            source, classifier, policy: Pipeline stages
+            sinks: List of Sink objects, called in order for every packet
+            metrics: ProjectionMetrics for stage timing (created if None)
+            before_frame: Optional callable run between frames (e.g. apply live settings)
+            max_failures: Stop after this many consecutive failed reads (None = never)
+            retry_delay: Seconds to wait after a failed read; with max_failures this
+                sets how long a camera dropout is tolerated
+            log_every: Log the classification every N frames (0 = off)
+            tracer: Optional LatencyTracer; each trigger's packet gets a trace
+                that sinks complete when the first scare frame is shown
+        """
+        self.source = source
+        self.classifier = classifier
+        self.policy = policy
+        self.sinks = list(sinks)
+        self.metrics = metrics if metrics is not None else ProjectionMetrics()
+        self.before_frame = before_frame
+        self.max_failures = max_failures
+        self.retry_delay = retry_delay
+        self.log_every = log_every
+        self.log_level = log_level
+        self.tracer = tracer
+        self.frame_count = 0
+        self.consecutive_failures = 0
+        self.stopped = threading.Event()
+        if isinstance(source, CameraSource):
+            self.metrics.add_source(lambda: {"camera_dropped_frames": source.dropped})
+
+    def stop(self):
+        self.stopped.set()
+
+    def step(self):
+        """Process one frame; returns the packet, or None if no frame was read"""
+        metrics = self.metrics
+        if self.before_frame is not None:
+            self.before_frame()
+
+        t0 = time.perf_counter()
+        frame, captured_at = self.source.read()
+        t1 = time.perf_counter()
+        metrics.observe("capture", t1 - t0)
+        if frame is None:
+            metrics.skip("camera_read")
+            self.consecutive_failures += 1
+            logging.warning(f"⚠️  Failed to read camera frame ({self.consecutive_failures})")
+            if self.max_failures and self.consecutive_failures >= self.max_failures:
+                logging.error(f"❌ Camera failed to read {self.max_failures} consecutive frames")
+                self.stop()
+            return None
+        self.consecutive_failures = 0
+
+        self.frame_count += 1
+        packet = FramePacket(self.frame_count, frame, captured_at)
+        packet.read_at = t1
+
+        packet.class_name, packet.confidence = self.classifier.classify(frame)
+        t2 = time.perf_counter()
+        packet.inferred_at = t2
+        metrics.observe("inference", t2 - t1)
+        if self.log_every and self.frame_count % self.log_every == 0:
+            logging.log(self.log_level, f"🔍 Frame {self.frame_count} classification: "
+                                        f"{packet.class_name} ({packet.confidence:.1%}), state: {self.policy.state}")
+
+        packet.triggered = self.policy.update(packet.class_name, packet.confidence)
+        packet.state = self.policy.state
+        if packet.triggered:
+            metrics.trigger()
+        metrics.set_state(packet.state)
+        t3 = time.perf_counter()
+        metrics.observe("decision", t3 - t2)
+        packet.decided_at = t3
+        if packet.triggered:
+            # on_scare() work (clip restart, player launch) belongs to the output stage
+            packet.decided_at = getattr(self.policy, "triggered_at", None) or t3
+            if self.tracer is not None:
+                packet.trace = self.tracer.begin(packet)
+
+        for sink in self.sinks:
+            if sink.consume(packet) is False:
+                self.stop()
+            t4 = time.perf_counter()
+            metrics.observe(sink.name, t4 - t3)
+            t3 = t4
+
+        metrics.frame_done()
+        return packet
+
+    def run(self):
+        """Run until stop() or a sink asks to stop"""
+        try:
+            while not self.stopped.is_set():
+                if self.step() is None and self.consecutive_failures and not self.stopped.is_set():
+                    time.sleep(self.retry_delay)
+        finally:
+            for sink in self.sinks:
+                sink.close()
@@ -0,0 +1,173 @@
+"""
+Display presenter with steady pacing
+- Owns the OpenCV window(s), fullscreen toggling and key handling
+- Takes finished frames from a one-slot mailbox per window (newest frame wins)
+- Presents on a fixed cadence matched to the display refresh rate
+- Counts presented, dropped (replaced before shown) and duplicated frames
+- Optional per-frame callbacks fired once the frame is on screen (latency tracing)
+
+OpenCV windows must be driven from the main thread on macOS, so run()
+blocks the main thread and the capture/inference loop runs on a worker
+thread that calls submit().
+"""
+
+import logging
+import threading
+import time
+
+import cv2
+
+
+class FrameMailbox:
+    """One-slot handoff between the render loop and the presenter"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._frame = None
+        self._fresh = False
+        self._on_present = []
+        self.dropped = 0
+
+    def submit(self, frame, on_present=None):
+        with self._lock:
+            if self._fresh:
+                self.dropped += 1  # Previous frame was never presented
+            self._frame = frame
+            self._fresh = True
+            if on_present is not None:
+                # Callbacks of a dropped frame carry over to the frame that replaces it
+                self._on_present.append(on_present)
+
+    def take(self):
+        """Latest frame, whether it is new since the last take(), and its on_present callbacks"""
+        with self._lock:
+            fresh = self._fresh
+            self._fresh = False
+            callbacks, self._on_present = self._on_present, []
+            return self._frame, fresh, callbacks
+
+
+class PresenterWindow:
+    """One output window and its mailbox"""
+
+    def __init__(self, name, fullscreen=False):
+        self.name = name
+        self.fullscreen = fullscreen
+        self.mailbox = FrameMailbox()
+        self.presented = 0
+        self.duplicated = 0
+        self.has_frame = False
+
+
+class Presenter:
+    def __init__(self, window_name, refresh_hz=60.0, fullscreen=False, on_key=None):
+        """
+        Args:
+            window_name: OpenCV window title of the primary window
+            refresh_hz: Display refresh rate to pace presentation to
+            fullscreen: Start the primary window in fullscreen mode
+            on_key: Callback for key presses other than F/Q/ESC
+        """
+        self.window_name = window_name
+        self.refresh_hz = refresh_hz
+        self.fullscreen = fullscreen
+        self.on_key = on_key
+        self.windows = {window_name: PresenterWindow(window_name, fullscreen)}
+        self.mailbox = self.windows[window_name].mailbox
+        self.late = 0
+        self.stopped = threading.Event()
+
+    def add_window(self, window_name, fullscreen=False):
+        """Extra window presented on the same cadence (call before open())"""
+        if window_name not in self.windows:
+            self.windows[window_name] = PresenterWindow(window_name, fullscreen)
+
+    def open(self):
+        """Create the windows (call from the main thread before run())"""
+        for window in self.windows.values():
+            cv2.namedWindow(window.name, cv2.WINDOW_NORMAL)
+            if window.fullscreen:
+                cv2.setWindowProperty(window.name, cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN)
+
+    def submit(self, frame, window_name=None, on_present=None):
+        """
+        Hand a finished frame to the presenter (any thread)
+
+        Args:
+            frame: Finished output frame
+            window_name: Target window (default: the primary window)
+            on_present: Called with time.perf_counter() once the frame is on screen
+        """
+        self.windows[window_name or self.window_name].mailbox.submit(frame, on_present)
+
+    def stop(self):
+        self.stopped.set()
+
+    def toggle_fullscreen(self):
+        current_state = cv2.getWindowProperty(self.window_name, cv2.WND_PROP_FULLSCREEN)
+        if current_state == cv2.WINDOW_FULLSCREEN:
+            cv2.setWindowProperty(self.window_name, cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_NORMAL)
+            logging.info("🔄 Switched to windowed mode")
+        else:
+            cv2.setWindowProperty(self.window_name, cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN)
+            logging.info("🔄 Switched to fullscreen mode")
+
+    def run(self):
+        """Present frames until Q/ESC or stop(); blocks the calling (main) thread"""
+        period = 1.0 / self.refresh_hz
+        next_tick = time.perf_counter()
+
+        while not self.stopped.is_set():
+            # Sleep until the next refresh slot; resync if we fell behind
+            now = time.perf_counter()
+            if now < next_tick:
+                time.sleep(next_tick - now)
+            elif now - next_tick > period:
+                self.late += 1
+                next_tick = now
+            next_tick += period
+
+            shown = []
+            for window in self.windows.values():
+                frame, fresh, callbacks = window.mailbox.take()
+                if fresh:
+                    cv2.imshow(window.name, frame)
+                    window.presented += 1
+                    window.has_frame = True
+                    shown.extend(callbacks)
+                elif window.has_frame:
+                    window.duplicated += 1  # Previous frame stays on screen for this refresh
+
+            # Handle key presses (any window); waitKey also paints the imshow'd frames
+            key = cv2.waitKey(1) & 0xFF
+            if shown:
+                now = time.perf_counter()
+                for on_present in shown:
+                    on_present(now)
+            if key == 255:
+                continue
+            if key in [ord('q'), ord('Q'), 27]:  # Q or ESC
+                self.stop()
+            elif key in [ord('f'), ord('F')]:  # Toggle fullscreen (primary window)
+                self.toggle_fullscreen()
+            elif self.on_key is not None:
+                self.on_key(key)
+
+    @property
+    def presented(self):
+        return sum(window.presented for window in self.windows.values())
+
+    @property
+    def duplicated(self):
+        return sum(window.duplicated for window in self.windows.values())
+
+    def stats(self):
+        """Presentation counters for metrics (summed over windows)"""
+        return {
+            "present_refresh_hz": self.refresh_hz,
+            "present_windows": len(self.windows),
+            "present_presented_frames": self.presented,
+            "present_dropped_frames": sum(window.mailbox.dropped for window in self.windows.values()),
+            "present_duplicated_frames": self.duplicated,
+            "present_late_ticks": self.late,
+        }
@@ -0,0 +1,238 @@
+"""
+Synthetic camera and stub classifier for load testing
+- SyntheticCapture: cv2.VideoCapture stand-in producing frames at a chosen
+  resolution, FPS and motion pattern, with injected "hand" events and
+  ground-truth onset timestamps
+- StubClassifier: reads the hand marker from synthetic frames after a
+  configurable latency, so capture/state/render throughput can be measured
+  without YOLO
+
+Use anywhere --source or --model is accepted:
+
+    --source "synthetic:3840x2160@60?motion=pan&hand_every=5&hand_duration=1"
+    --model stub:15          # 15 ms inference latency
+"""
+
+import logging
+import random
+import time
+from urllib.parse import parse_qsl
+
+import cv2
+import numpy as np
+
+from .pipeline import Classifier
+
+MARKER_SIZE = 8
+HAND_MARKER = (0, 255, 255)  # BGR block in the top-left corner of frames with a hand
+MOTIONS = ("static", "pan", "noise")
+SYNTHETIC_PREFIXES = ("synthetic:", "synthetic@", "synthetic?")
+
+
+def is_synthetic(source):
+    """'synthetic' or 'synthetic' followed by :size, @fps or ?options (not synthetic_clip.mp4)"""
+    return isinstance(source, str) and (source == "synthetic" or source.startswith(SYNTHETIC_PREFIXES))
+
+
+def is_stub_model(model):
+    """'stub' or 'stub:latency[:jitter]' (not a model file such as stub_hands.pt)"""
+    return isinstance(model, str) and (model == "stub" or model.startswith("stub:"))
+
+
+def open_capture(source):
+    """cv2.VideoCapture for cameras/files, SyntheticCapture for synthetic:... specs"""
+    if is_synthetic(source):
+        return SyntheticCapture.from_spec(source)
+    return cv2.VideoCapture(source)
+
+
+class SyntheticCapture:
+    def __init__(self, width=1280, height=720, fps=30.0, motion="pan",
+                 hand_every=0.0, hand_duration=1.0, hand_start=None, realtime=True, seed=0):
+        """
+        Args:
+            width, height, fps: Output format
+            motion: "static", "pan" (scrolling scene) or "noise" (new noise every frame)
+            hand_every: Seconds between injected hand events (0 = none)
+            hand_duration: Seconds each hand stays visible
+            hand_start: Seconds until the first hand (defaults to hand_every)
+            realtime: Pace read() to the FPS like a real camera; False = as fast as possible
+        """
+        if motion not in MOTIONS:
+            raise ValueError(f"Unknown motion {motion!r} (expected one of {', '.join(MOTIONS)})")
+        self.width = int(width)
+        self.height = int(height)
+        self.fps = float(fps)
+        self.motion = motion
+        self.hand_every = float(hand_every)
+        self.hand_duration = float(hand_duration)
+        self.hand_start = float(hand_start) if hand_start is not None else self.hand_every
+        self.realtime = realtime
+        self.rng = np.random.default_rng(seed)
+
+        self.frame_index = 0
+        self.hand_visible = False
+        self.hand_onsets = []  # time.perf_counter() of each first frame showing a hand
+        self._opened = True
+        self._started = None
+        self._next_time = None
+
+        # Scene twice as wide so panning is a slice, not a roll
+        gradient = np.linspace(0, 255, self.width * 2, dtype=np.float32)
+        scene = np.empty((self.height, self.width * 2, 3), dtype=np.uint8)
+        scene[:, :, 0] = gradient.astype(np.uint8)
+        scene[:, :, 1] = gradient[::-1].astype(np.uint8)
+        scene[:, :, 2] = 64
+        step = max(self.width // 12, 8)
+        scene[:, ::step] = 255
+        self._scene = scene
+
+    @classmethod
+    def from_spec(cls, spec):
+        """Parse 'synthetic[:WxH][@FPS][?key=value&...]'"""
+        body = spec[len("synthetic"):].lstrip(":")
+        body, _, query = body.partition("?")
+        kwargs = {}
+        if "@" in body:
+            body, fps = body.split("@", 1)
+            kwargs["fps"] = float(fps)
+        if body:
+            width, height = body.lower().split("x")
+            kwargs["width"], kwargs["height"] = int(width), int(height)
+        for key, value in parse_qsl(query):
+            if key == "motion":
+                kwargs[key] = value
+            elif key == "realtime":
+                kwargs[key] = value.lower() not in ("0", "false", "no")
+            elif key in ("hand_every", "hand_duration", "hand_start", "seed"):
+                kwargs[key] = float(value) if key != "seed" else int(value)
+            else:
+                raise ValueError(f"Unknown synthetic source option {key!r}")
+        capture = cls(**kwargs)
+        logging.info(f"🧪 Synthetic source: {capture.width}x{capture.height}@{capture.fps:g} "
+                     f"motion={capture.motion} hand_every={capture.hand_every:g}s")
+        return capture
+
+    # cv2.VideoCapture interface ------------------------------------------------
+
+    def isOpened(self):
+        return self._opened
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return float(self.width)
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return float(self.height)
+        if prop == cv2.CAP_PROP_FPS:
+            return self.fps
+        if prop == cv2.CAP_PROP_POS_FRAMES:
+            return float(self.frame_index)
+        return 0.0
+
+    def set(self, prop, value):
+        return False
+
+    def release(self):
+        self._opened = False
+
+    def read(self):
+        if not self._opened:
+            return False, None
+
+        now = time.perf_counter()
+        if self._started is None:
+            self._started = now
+            self._next_time = now
+        if self.realtime:
+            if now < self._next_time:
+                time.sleep(self._next_time - now)
+            elif now - self._next_time > 1.0 / self.fps:
+                self._next_time = now  # Reader fell behind: don't burst to catch up
+            self._next_time += 1.0 / self.fps
+        elapsed = self.frame_index / self.fps  # Scene time follows frames, not wall clock
+
+        frame = self._render_scene()
+        hand = self._hand_at(elapsed)
+        if hand and not self.hand_visible:
+            self.hand_onsets.append(time.perf_counter())
+        self.hand_visible = hand
+        if hand:
+            self._draw_hand(frame, elapsed)
+        frame[:MARKER_SIZE, :MARKER_SIZE] = HAND_MARKER if hand else (0, 0, 0)
+
+        self.frame_index += 1
+        return True, frame
+
+    # Frame generation --------------------------------------------------------
+
+    def _render_scene(self):
+        if self.motion == "noise":
+            return self.rng.integers(0, 256, (self.height, self.width, 3), dtype=np.uint8)
+        offset = 0
+        if self.motion == "pan":
+            offset = (self.frame_index * max(self.width // 120, 1)) % self.width
+        return self._scene[:, offset:offset + self.width].copy()
+
+    def _hand_at(self, elapsed):
+        if self.hand_every <= 0 or elapsed < self.hand_start:
+            return False
+        return (elapsed - self.hand_start) % self.hand_every < self.hand_duration
+
+    def _draw_hand(self, frame, elapsed):
+        """Skin-toned palm and fingers drifting across the frame"""
+        h, w = frame.shape[:2]
+        cx = int(w * (0.3 + 0.4 * ((elapsed * 0.5) % 1.0)))
+        cy = h // 2
+        size = min(w, h) // 6
+        skin = (140, 170, 230)
+        cv2.ellipse(frame, (cx, cy), (size, int(size * 1.2)), 0, 0, 360, skin, -1)
+        for i in range(5):
+            fx = cx - size + i * size // 2
+            cv2.ellipse(frame, (fx, cy - int(size * 1.5)), (size // 6, size // 2), 0, 0, 360, skin, -1)
+
+
+class StubClassifier(Classifier):
+    """Reports 'hand' when a frame carries the synthetic hand marker"""
+
+    names = {0: 'hand', 1: 'not_hand'}
+
+    def __init__(self, latency_ms=0.0, jitter_ms=0.0, confidence=0.95, busy=False, seed=0):
+        """
+        Args:
+            latency_ms: Mean simulated inference time
+            jitter_ms: Uniform +/- variation of the latency
+            confidence: Confidence reported for the winning class
+            busy: Burn CPU for the latency (holds the GIL like real inference)
+                instead of sleeping
+        """
+        self.latency = latency_ms / 1000.0
+        self.jitter = jitter_ms / 1000.0
+        self.confidence = confidence
+        self.busy = busy
+        self._random = random.Random(seed)
+
+    @classmethod
+    def from_spec(cls, spec):
+        """Parse 'stub[:latency_ms[:jitter_ms]]'"""
+        parts = spec.split(":")[1:]
+        latency = float(parts[0]) if parts and parts[0] else 0.0
+        jitter = float(parts[1]) if len(parts) > 1 else 0.0
+        logging.info(f"🧪 Stub classifier: {latency:g} ms ± {jitter:g} ms")
+        return cls(latency_ms=latency, jitter_ms=jitter)
+
+    def classify(self, frame):
+        delay = self.latency
+        if self.jitter:
+            delay = max(0.0, delay + self._random.uniform(-self.jitter, self.jitter))
+        if delay:
+            if self.busy:
+                end = time.perf_counter() + delay
+                while time.perf_counter() < end:
+                    pass
+            else:
+                time.sleep(delay)
+
+        marker = frame[MARKER_SIZE // 2, MARKER_SIZE // 2]
+        if tuple(int(v) for v in marker) == HAND_MARKER:
+            return "hand", self.confidence
+        return "not_hand", self.confidence
@@ -0,0 +1,139 @@
+"""
+Capture-to-projection latency tracing
+- Camera frames are stamped at capture; the pipeline adds read, inference
+  and decision stamps to each packet
+- A triggering packet opens a LatencyTrace that follows the scare to the
+  moment its first frame is presented (or playback is started)
+- Per-trigger end-to-end percentiles plus a per-stage breakdown:
+
+    queue      captured → read by the pipeline (waiting behind a slow frame)
+    inference  read → classified
+    decision   classified → policy switched to scare
+    output     switched → first scare frame handed to the display/player
+    present    handed over → shown on screen
+
+All stamps are time.perf_counter() values.
+"""
+
+import logging
+import threading
+from collections import deque
+
+STAGES = ("queue", "inference", "decision", "output", "present")
+PERCENTILES = (50, 90, 95, 99)
+
+
+def percentile(values, q):
+    """Nearest-rank percentile (q in 0..100); NaN for no values"""
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q / 100.0 * (len(ordered) - 1))))]
+
+
+class LatencyTrace:
+    """Timestamps of one trigger, from camera capture to presentation"""
+
+    def __init__(self, tracer, index, captured_at, read_at, inferred_at, decided_at):
+        self.tracer = tracer
+        self.index = index
+        self.captured_at = captured_at
+        self.read_at = read_at
+        self.inferred_at = inferred_at
+        self.decided_at = decided_at
+        self.submitted_at = None
+        self.presented_at = None
+
+    def submitted(self, now):
+        """First scare frame handed to the presenter/player"""
+        if self.submitted_at is None:
+            self.submitted_at = now
+
+    def presented(self, now):
+        """First scare frame shown; completes the trace (later calls are ignored)"""
+        if self.presented_at is not None:
+            return
+        if self.submitted_at is None:
+            self.submitted_at = now
+        self.presented_at = now
+        self.tracer.complete(self)
+
+    @property
+    def total(self):
+        return self.presented_at - self.captured_at
+
+    def stages(self):
+        """Seconds spent in each stage"""
+        marks = (self.captured_at, self.read_at, self.inferred_at, self.decided_at,
+                 self.submitted_at, self.presented_at)
+        return {stage: end - start for stage, start, end in zip(STAGES, marks, marks[1:])}
+
+
+class LatencyTracer:
+    def __init__(self, max_traces=1000, log_each=True):
+        """
+        Args:
+            max_traces: Completed traces kept for percentiles (oldest dropped first)
+            log_each: Log every completed trigger with its stage breakdown
+        """
+        self.traces = deque(maxlen=max_traces)
+        self.log_each = log_each
+        self.started = 0
+        self.completed = 0
+        self._lock = threading.Lock()
+
+    def begin(self, packet):
+        """Open a trace for a packet that triggered a scare"""
+        with self._lock:
+            self.started += 1
+            index = self.started
+        return LatencyTrace(self, index, packet.captured_at, packet.read_at,
+                            packet.inferred_at, packet.decided_at)
+
+    def complete(self, trace):
+        with self._lock:
+            self.traces.append(trace)
+            self.completed += 1
+        if self.log_each:
+            breakdown = ", ".join(f"{stage} {seconds * 1000:.1f}"
+                                  for stage, seconds in trace.stages().items())
+            logging.info(f"⏱️  Trigger #{trace.index}: {trace.total * 1000:.1f} ms capture → projection "
+                         f"({breakdown} ms)")
+
+    def report(self):
+        """{'total': {p: seconds}, stage: {p: seconds}, ...} over completed traces"""
+        with self._lock:
+            traces = list(self.traces)
+        report = {"total": {q: percentile([t.total for t in traces], q) for q in PERCENTILES}}
+        stages = [t.stages() for t in traces]
+        for stage in STAGES:
+            report[stage] = {q: percentile([s[stage] for s in stages], q) for q in PERCENTILES}
+        return report
+
+    def stats(self):
+        """Trigger latency percentiles for metrics"""
+        if not self.traces:
+            return {"trigger_latency_samples": 0}
+        report = self.report()
+        values = {"trigger_latency_samples": len(self.traces)}
+        for q in PERCENTILES:
+            values[f"trigger_latency_p{q}_seconds"] = report["total"][q]
+        for stage in STAGES:
+            values[f"trigger_latency_{stage}_p50_seconds"] = report[stage][50]
+        return values
+
+    def log_summary(self):
+        """Log the percentile table (e.g. at shutdown)"""
+        pending = self.started - self.completed
+        if not self.traces:
+            logging.info(f"⏱️  No completed trigger traces ({pending} pending)")
+            return
+        report = self.report()
+        header = " ".join(f"{f'p{q}':>8}" for q in PERCENTILES)
+        logging.info(f"⏱️  Trigger latency over {len(self.traces)} trigger(s), ms:")
+        logging.info(f"   {'stage':<10} {header}")
+        for name in ("total",) + STAGES:
+            row = " ".join(f"{report[name][q] * 1000:>8.1f}" for q in PERCENTILES)
+            logging.info(f"   {name:<10} {row}")
+        if pending:
+            logging.info(f"   ({pending} trigger(s) never reached the display)")
@@ -0,0 +1,228 @@
+"""
+Loop-optimized clip transcode cache
+- Transcode each clip once, at the size the output actually shows, into a
+  seek-friendly format: all-intra MJPG (every frame a keyframe, cheap to
+  decode) or raw frames (.npy, memory-mapped, no decode at all)
+- Entries are keyed by a hash of the source file's content, so renamed clips
+  still hit and edited clips miss
+- Used automatically at startup when a matching entry exists
+
+Prepare the cache with scripts/prepare_clips.py, e.g.
+
+    python scripts/prepare_clips.py --output "size=1920x1080" videos/*.mp4
+"""
+
+import glob
+import hashlib
+import json
+import logging
+import os
+
+import cv2
+import numpy as np
+
+from .clips import SeekIndex, open_clip
+
+FORMATS = {"mjpg": ".avi", "raw": ".npy"}
+DEFAULT_CACHE_DIR = ".clip_cache"
+
+
+def _load_json(path, default):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def content_hash(path, cache_dir=DEFAULT_CACHE_DIR):
+    """SHA-1 of a file's content, memoized per (path, size, mtime) in the cache dir"""
+    stat = os.stat(path)
+    memo_path = os.path.join(cache_dir, "sources.json")
+    memo = _load_json(memo_path, {})
+    key = os.path.abspath(path)
+    entry = memo.get(key)
+    if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+        return entry["sha1"]
+
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    sha1 = digest.hexdigest()
+
+    if os.path.isdir(cache_dir):
+        memo[key] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha1": sha1}
+        tmp_path = memo_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(memo, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, memo_path)
+    return sha1
+
+
+def count_frames(path):
+    """Frames a clip actually decodes to (containers may report 0, -1 or an estimate)"""
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise IOError(f"Could not open video: {path}")
+    count = 0
+    try:
+        while cap.grab():
+            count += 1
+    finally:
+        cap.release()
+    return count
+
+
+def find_transcoded(path, cache_dir=DEFAULT_CACHE_DIR, size=None):
+    """
+    Metadata of the best cache entry for a clip, or None
+
+    Prefers an entry at exactly `size`, otherwise the largest one; raw
+    frames win over MJPG at the same size.
+    """
+    if not cache_dir or not os.path.isdir(cache_dir) or not os.path.exists(path):
+        return None
+    prefix = content_hash(path, cache_dir)[:16]
+    entries = []
+    for meta_path in glob.glob(os.path.join(cache_dir, f"{prefix}_*.json")):
+        meta = _load_json(meta_path, None)
+        if meta and os.path.exists(os.path.join(cache_dir, meta["file"])):
+            entries.append(meta)
+    if not entries:
+        return None
+    entries.sort(key=lambda meta: meta["format"] != "raw")
+    for meta in entries:
+        if size is not None and tuple(meta["size"]) == tuple(size):
+            return meta
+    return max(entries, key=lambda meta: meta["size"][0] * meta["size"][1])
+
+
+def transcode_clip(path, size, cache_dir=DEFAULT_CACHE_DIR, fmt="mjpg", quality=95):
+    """
+    Transcode a clip to (width, height) in the cache; returns the entry's metadata
+
+    Args:
+        path: Source clip
+        size: Stored frame size (see ProjectionOutput.native_source_size)
+        cache_dir: Cache directory (created if missing)
+        fmt: "mjpg" (all-intra, compact) or "raw" (uncompressed .npy, no decode cost)
+        quality: JPEG quality for mjpg
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown transcode format {fmt!r} (expected one of {', '.join(FORMATS)})")
+    os.makedirs(cache_dir, exist_ok=True)
+    width, height = size
+    name = f"{content_hash(path, cache_dir)[:16]}_{width}x{height}_{fmt}"
+    out_path = os.path.join(cache_dir, name + FORMATS[fmt])
+    tmp_path = out_path + ".tmp" + FORMATS[fmt]
+
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise IOError(f"Could not open video: {path}")
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+
+    writer = None
+    frames = None
+    frame_count = None  # Raw only: the memmap's allocated length
+    written = 0
+    overflow = False
+    try:
+        if fmt == "mjpg":
+            writer = cv2.VideoWriter(tmp_path, cv2.VideoWriter_fourcc(*"MJPG"), fps, (width, height))
+            if not writer.isOpened():
+                raise IOError(f"Could not write MJPG clip: {tmp_path}")
+            writer.set(cv2.VIDEOWRITER_PROP_QUALITY, quality)
+        else:
+            # The memmap is sized up front, so count decodable frames rather than trust the container
+            frame_count = count_frames(path)
+            if frame_count == 0:
+                raise IOError(f"No frames decoded from video: {path}")
+            frames = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.uint8,
+                                               shape=(frame_count, height, width, 3))
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            if (frame.shape[1], frame.shape[0]) != (width, height):
+                frame = cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+            if writer is not None:
+                writer.write(frame)
+            elif written < frame_count:
+                frames[written] = frame
+            else:
+                overflow = True  # More frames than counted; the entry would be missing some
+                break
+            written += 1
+    finally:
+        cap.release()
+        if writer is not None:
+            writer.release()
+        if frames is not None:
+            frames.flush()
+            del frames
+
+    # Never publish an entry that is missing frames
+    if written == 0:
+        os.remove(tmp_path)
+        raise IOError(f"No frames decoded from video: {path}")
+    if overflow or (frame_count is not None and written < frame_count):
+        os.remove(tmp_path)
+        decoded = f"more than {frame_count}" if overflow else f"{written} of {frame_count}"
+        raise IOError(f"Decoded {decoded} counted frames from {path}; not caching it")
+    os.replace(tmp_path, out_path)
+
+    meta = {
+        "source": os.path.abspath(path),
+        "file": os.path.basename(out_path),
+        "format": fmt,
+        "size": [width, height],
+        "fps": fps,
+        "frames": written,
+    }
+    with open(os.path.join(cache_dir, name + ".json"), "w") as f:
+        json.dump(meta, f, indent=2)
+    logging.info(f"✅ Transcoded {path} → {out_path} ({written} frames, {width}x{height}, {fmt})")
+    return meta
+
+
+class RawClip:
+    """Uncompressed frames memory-mapped from a .npy file; nothing to decode"""
+
+    def __init__(self, path, fps, frame_count=None):
+        self.path = path
+        self.frames = np.load(path, mmap_mode="r")[:frame_count]  # Containers may over-report frames
+        if len(self.frames) == 0:
+            raise IOError(f"No frames in raw clip: {path}")
+        self.fps = fps
+        self.height, self.width = self.frames.shape[1:3]
+        self._position = 0
+
+    def read(self):
+        frame = self.frames[self._position]
+        self._position = (self._position + 1) % len(self.frames)
+        return frame
+
+    def restart(self):
+        self._position = 0
+
+    def release(self):
+        self.frames = None
+
+
+def open_prepared_clip(path, hot_frames=30, cache_budget_mb=256, cache_dir=DEFAULT_CACHE_DIR, size=None):
+    """open_clip() on the transcoded version of a clip when the cache has one"""
+    meta = find_transcoded(path, cache_dir, size) if cache_dir else None
+    if meta is None:
+        return open_clip(path, hot_frames, cache_budget_mb)
+
+    cached_path = os.path.join(cache_dir, meta["file"])
+    stored = f"{meta['size'][0]}x{meta['size'][1]}"
+    if size is not None and tuple(meta["size"]) != tuple(size):
+        logging.warning(f"⚠️  Transcoded {path} is {stored}, output wants {size[0]}x{size[1]} "
+                        f"(re-run scripts/prepare_clips.py to skip the per-frame resize)")
+    logging.info(f"✓ Using transcoded {path} ({stored} {meta['format']}: {cached_path})")
+    if meta["format"] == "raw":
+        return RawClip(cached_path, meta["fps"], meta["frames"])
+    # All-intra: every frame is a keyframe, so restart seeks land exactly
+    return open_clip(cached_path, hot_frames, cache_budget_mb, index=SeekIndex(range(meta["frames"])))
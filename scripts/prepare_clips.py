@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Prepare loop-optimized clips for simple_projection.py
+- Transcodes each clip once to the size an output shows it at
+- All-intra MJPG (default) or raw frames, so looping/restarting is a cheap
+  exact seek and nothing is resized per frame
+- Stored in a content-hash-keyed cache directory that simple_projection.py
+  checks automatically at startup
+
+Usage:
+    python scripts/prepare_clips.py --camera-size 1280x720
+    python scripts/prepare_clips.py --output "size=1920x1080" --format raw videos/*.mp4
+"""
+
+import argparse
+import logging
+import os
+import sys
+
+# Shared pipeline package lives at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from projection import ProjectionOutput, ProjectionWarp, transcode_clip
+from projection.transcode import DEFAULT_CACHE_DIR, FORMATS
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    datefmt='%H:%M:%S'
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Transcode projection clips into the loop-optimized cache")
+    parser.add_argument("clips", nargs="*", default=["videos/sleeping_face.mp4", "videos/angry_face.mp4"],
+                        help="Clips to prepare (default: the sleep and scare videos)")
+    parser.add_argument("--output", action="append", metavar="SPEC",
+                        help="Output spec as passed to simple_projection.py (repeatable; default: the main window)")
+    parser.add_argument("--camera-size", help="Camera resolution WxH, for outputs without an explicit size")
+    parser.add_argument("--warp", help="Projection warp JSON used on the main output")
+    parser.add_argument("--format", choices=sorted(FORMATS), default="mjpg",
+                        help="mjpg = all-intra, compact; raw = uncompressed frames, no decode at all")
+    parser.add_argument("--quality", type=int, default=95, help="JPEG quality for mjpg")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="Transcode cache directory")
+    args = parser.parse_args()
+
+    camera_size = None
+    if args.camera_size:
+        width, height = args.camera_size.lower().split("x")
+        camera_size = (int(width), int(height))
+
+    try:
+        outputs = [ProjectionOutput.from_spec(spec, f"output{i + 1}") for i, spec in enumerate(args.output or [""])]
+        if args.warp and outputs[0].warp is None:
+            outputs[0].warp = ProjectionWarp.from_file(args.warp)
+    except (OSError, ValueError) as e:
+        logging.error(f"Invalid --output/--warp: {e}")
+        return 1
+
+    sizes = []
+    for output in outputs:
+        if output.size is None and camera_size is None and (output.warp is None or output.warp.output_size is None):
+            logging.error(f"Output {output.name} has no size: pass --camera-size WxH or size= in --output")
+            return 1
+        size = output.native_source_size(camera_size)
+        if size not in sizes:
+            sizes.append(size)
+
+    failed = 0
+    for path in args.clips:
+        for size in sizes:
+            try:
+                transcode_clip(path, size, args.cache_dir, fmt=args.format, quality=args.quality)
+            except (OSError, ValueError) as e:
+                logging.error(f"❌ {path}: {e}")
+                failed += 1
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -13,10 +13,16 @@ import logging
 import threading
 import platform
 import os
-from ultralytics import YOLO
+import sys
 import cv2
 import vlc
 
+# Shared pipeline package lives at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from projection import (CameraSource, ControlServer, HandTriggerPolicy, LatencyTracer, Pipeline,
+                        ProjectionMetrics, Sink, StubClassifier, YoloClassifier, is_stub_model, is_synthetic,
+                        open_capture, parse_classification)
+
 # Set up logging
 logging.basicConfig(
     level=logging.INFO,
@@ -105,7 +111,7 @@ def detect_displays():
     
     return displays
 
-class VLCProjectionController:
+class VLCProjectionController(HandTriggerPolicy):
     def __init__(self, video_sleep_path="videos/sleeping_face.mp4", 
                  video_scare_path="videos/angry_face.mp4", 
                  fullscreen_display=None):
@@ -117,6 +123,9 @@ class VLCProjectionController:
             video_scare_path: Path to scare/alert video  
             fullscreen_display: Display index for fullscreen (None = primary)
         """
+        # State management: 99% confidence, 2s scare, 0.5s minimum between state changes
+        super().__init__(confidence_threshold=0.99, scare_duration=2.0, debounce_time=0.5)
+        
         self.video_sleep_path = video_sleep_path
         self.video_scare_path = video_scare_path
         self.fullscreen_display = fullscreen_display
@@ -136,14 +145,8 @@ class VLCProjectionController:
         self.instance = vlc.Instance(vlc_args)
         self.player = self.instance.media_player_new()
         
-        # State management
         self.lock = threading.Lock()
-        self.state = "idle"  # "idle" or "scare"
-        self.confidence_threshold = 0.99  # 99% confidence required
-        self.scare_duration = 2.0  # seconds to stay in scare mode
-        self.last_trigger = 0.0
-        self.debounce_time = 0.5  # Minimum time between state changes
-        self.last_state_change = 0.0
+        self.last_playback = None  # (video_path, requested_at, started_at) in time.perf_counter()
         
         # Verify video files exist
         self._verify_video_files()
@@ -179,6 +182,7 @@ class VLCProjectionController:
                 logging.error(f"❌ Video file not found: {video_path}")
                 return False
             
+            requested_at = time.perf_counter()
             try:
                 # Close any existing VLC
                 import subprocess
@@ -190,6 +194,7 @@ class VLCProjectionController:
                 cmd = ['open', '-a', 'VLC', abs_path]
                 
                 subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                self.last_playback = (video_path, requested_at, time.perf_counter())
                 logging.info(f"🎬 Playing: {os.path.basename(video_path)}")
                 return True
                 
@@ -218,22 +223,18 @@ class VLCProjectionController:
             self.last_trigger = now
             self.last_state_change = now
     
+    def on_scare(self):
+        """Policy hook: hand detected → scare video"""
+        self.play_video(self.video_scare_path)
+    
+    def on_idle(self):
+        """Policy hook: scare timed out → sleep video"""
+        self.play_video(self.video_sleep_path)
+    
     def process_classification(self, result):
         """Process YOLO classification result and trigger video switch if hand detected"""
-        now = time.time()
-        
-        # Get classification results
-        confidence = result.probs.top1conf.item()  # 0.0 to 1.0
-        class_name = result.names[result.probs.top1]  # 'hand' or 'not_hand'
-        
-        # State machine logic
-        if class_name == 'hand' and confidence >= self.confidence_threshold and self.state != "scare":
-            logging.info(f"🖐️  HAND DETECTED! Confidence: {confidence:.1%}")
-            self.set_state("scare")
-            
-        elif self.state == "scare" and (now - self.last_trigger) >= self.scare_duration:
-            logging.info("   → SCARE timeout, returning to IDLE")
-            self.set_state("idle")
+        class_name, confidence = parse_classification(result)  # 'hand'/'not_hand', 0.0 to 1.0
+        self.update(class_name, confidence)
         
         return {
             'confidence': confidence,
@@ -241,10 +242,64 @@ class VLCProjectionController:
             'state': self.state
         }
 
+class PlaybackTraceSink(Sink):
+    """Completes trigger latency traces once the scare video has been launched"""
+    name = "playback"
+    
+    def __init__(self, controller):
+        self.controller = controller
+    
+    def consume(self, packet):
+        trace = packet.trace
+        playback = self.controller.last_playback
+        if trace is None or playback is None:
+            return
+        video_path, requested_at, started_at = playback
+        # The VLC app is launched externally and can't report when it is playing,
+        # so the trace ends when the launch command has been issued
+        if video_path == self.controller.video_scare_path and requested_at >= trace.decided_at:
+            trace.submitted(requested_at)
+            trace.presented(started_at)
+
+class PreviewSink(Sink):
+    """Camera window with classification overlay (--show)"""
+    name = "preview"
+    
+    def __init__(self, controller, window_name="YOLO Hand Detection → VLC Projection"):
+        self.controller = controller
+        self.window_name = window_name
+    
+    def consume(self, packet):
+        display_frame = packet.frame.copy()
+        
+        # Add status overlay
+        status_color = (0, 255, 0) if packet.state == "idle" else (0, 0, 255)
+        cv2.putText(display_frame, f"State: {packet.state.upper()}", (10, 30), 
+                   cv2.FONT_HERSHEY_SIMPLEX, 1, status_color, 2)
+        cv2.putText(display_frame, f"Frame: {packet.index}", (10, 70), 
+                   cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+        cv2.putText(display_frame, f"Class: {packet.class_name}", (10, 110), 
+                   cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+        cv2.putText(display_frame, f"Confidence: {packet.confidence:.1%}", (10, 150), 
+                   cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+        
+        # Add threshold indicator
+        threshold = self.controller.confidence_threshold
+        threshold_color = (0, 255, 0) if packet.confidence >= threshold else (0, 0, 255)
+        cv2.putText(display_frame, f"Threshold: {threshold:.0%}", (10, 190), 
+                   cv2.FONT_HERSHEY_SIMPLEX, 0.7, threshold_color, 2)
+        
+        cv2.imshow(self.window_name, display_frame)
+        
+        key = cv2.waitKey(1) & 0xFF
+        if key == 27 or key == ord('q'):  # ESC or Q
+            logging.info("User requested exit")
+            return False
+
 def parse_args():
     p = argparse.ArgumentParser(description="YOLO Hand Detection → VLC Video Projection")
-    p.add_argument("--model", default="Colin1.pt", help="YOLO model file (hand detection)")
-    p.add_argument("--source", default=0, help="Camera index (0=built-in, 1=external, etc.) or video file")
+    p.add_argument("--model", default="Colin1.pt", help="YOLO model file (hand detection), or stub[:latency_ms] for load tests")
+    p.add_argument("--source", default=0, help="Camera index (0=built-in, 1=external, etc.), video file or synthetic[:WxH][@FPS][?options]")
     p.add_argument("--list-cameras", action="store_true", help="List available cameras and exit")
     p.add_argument("--list-displays", action="store_true", help="List available displays and exit")
     p.add_argument("--conf", type=float, default=0.5, help="YOLO detection confidence")
@@ -255,6 +310,8 @@ def parse_args():
     p.add_argument("--fullscreen-display", type=int, help="Display index for fullscreen projection")
     p.add_argument("--show", action="store_true", help="Show camera window with detections")
     p.add_argument("--debug", action="store_true", help="Enable debug logging")
+    p.add_argument("--control-port", type=int, help="Serve metrics/live control on this local port (disabled by default)")
+    p.add_argument("--control-host", default="127.0.0.1", help="Interface for the control endpoint")
     return p.parse_args()
 
 def main():
@@ -283,16 +340,22 @@ def main():
     
     # Load YOLO model
     try:
-        logging.info(f"Loading YOLO model: {args.model}")
-        model = YOLO(args.model)
-        logging.info(f"✓ Model loaded: {len(model.names)} classes available")
-        
-        # Check model classes (should be {0: 'hand', 1: 'not_hand'})
-        logging.info(f"✓ Model classes: {model.names}")
-        if 'hand' in model.names.values():
-            logging.info("✓ Hand classification model detected")
+        if is_stub_model(args.model):
+            classifier = StubClassifier.from_spec(args.model)
         else:
-            logging.warning("⚠️  Expected 'hand' class not found in model")
+            # Imported here so stub runs and benchmarks work without ultralytics installed
+            from ultralytics import YOLO
+            logging.info(f"Loading YOLO model: {args.model}")
+            model = YOLO(args.model)
+            logging.info(f"✓ Model loaded: {len(model.names)} classes available")
+            
+            # Check model classes (should be {0: 'hand', 1: 'not_hand'})
+            logging.info(f"✓ Model classes: {model.names}")
+            if 'hand' in model.names.values():
+                logging.info("✓ Hand classification model detected")
+            else:
+                logging.warning("⚠️  Expected 'hand' class not found in model")
+            classifier = YoloClassifier(model)
             
     except Exception as e:
         logging.error(f"Failed to load YOLO model: {e}")
@@ -325,11 +388,14 @@ def main():
     logging.info("Press 'q' or ESC to quit (when --show enabled), or Ctrl+C")
     logging.info("-" * 60)
     
-    frame_count = 0
+    cap = None
+    camera = None
+    control = None
+    tracer = None
     
     try:
         # For classification, we need to process frames one by one
-        cap = cv2.VideoCapture(src)
+        cap = open_capture(src)
         
         if not cap.isOpened():
             logging.error(f"❌ Could not open camera/video source: {src}")
@@ -374,65 +440,39 @@ def main():
             
         logging.info(f"✅ Camera {src} opened successfully ({test_frame.shape[1]}x{test_frame.shape[0]})")
         
-        consecutive_failures = 0
-        max_failures = 5
+        # Optional metrics/control endpoint
+        metrics = ProjectionMetrics()
+        tracer = LatencyTracer()
+        metrics.add_source(tracer.stats)
+        if args.control_port:
+            # No debug/production mode here: only the trigger settings can change live
+            control = ControlServer(metrics, host=args.control_host, port=args.control_port,
+                                    settings=lambda: {
+                                        'confidence_threshold': controller.confidence_threshold,
+                                        'scare_duration': controller.scare_duration,
+                                    },
+                                    allowed=('confidence_threshold', 'scare_duration'))
+            control.start()
         
-        while True:
-            ret, frame = cap.read()
-            if not ret:
-                consecutive_failures += 1
-                if consecutive_failures >= max_failures:
-                    logging.error(f"❌ Camera failed to read {max_failures} consecutive frames")
-                    logging.error("💡 Camera may have disconnected or been claimed by another app")
-                    break
-                logging.warning(f"⚠️  Failed to read frame ({consecutive_failures}/{max_failures}), retrying...")
-                time.sleep(0.1)
-                continue
-            
-            # Reset failure counter on successful read
-            consecutive_failures = 0
-                
-            frame_count += 1
-            
-            # YOLO classification (automatic preprocessing)
-            results = model(frame, verbose=False)
-            r = results[0]  # Single result for classification
-            
-            # Process classification result through projection controller
-            result = controller.process_classification(r)
-            
-            # Show video with classification results
-            if args.show:
-                display_frame = frame.copy()
-                
-                # Add status overlay
-                status_color = (0, 255, 0) if result['state'] == "idle" else (0, 0, 255)
-                cv2.putText(display_frame, f"State: {result['state'].upper()}", (10, 30), 
-                           cv2.FONT_HERSHEY_SIMPLEX, 1, status_color, 2)
-                cv2.putText(display_frame, f"Frame: {frame_count}", (10, 70), 
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
-                cv2.putText(display_frame, f"Class: {result['class_name']}", (10, 110), 
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
-                cv2.putText(display_frame, f"Confidence: {result['confidence']:.1%}", (10, 150), 
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
-                
-                # Add threshold indicator
-                threshold_color = (0, 255, 0) if result['confidence'] >= controller.confidence_threshold else (0, 0, 255)
-                cv2.putText(display_frame, f"Threshold: {controller.confidence_threshold:.0%}", (10, 190), 
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.7, threshold_color, 2)
-                
-                cv2.imshow("YOLO Hand Detection → VLC Projection", display_frame)
-                
-                key = cv2.waitKey(1) & 0xFF
-                if key == 27 or key == ord('q'):  # ESC or Q
-                    logging.info("User requested exit")
-                    break
-            
-            # Debug info every 100 frames
-            if args.debug and frame_count % 100 == 0:
-                logging.debug(f"Frame {frame_count}, State: {result['state']}, Class: {result['class_name']}, Conf: {result['confidence']:.1%}")
-                
-        cap.release()
+        # Shared pipeline: camera → YOLO → state machine → VLC (+ optional preview window)
+        # USB cameras can drop out briefly: 5 failed reads 0.1 s apart (~0.5 s) before giving up
+        camera = CameraSource(cap, threaded=isinstance(src, int) or is_synthetic(src), retry_delay=0.1)
+        pipeline = Pipeline(
+            camera,
+            classifier,
+            controller,
+            [PlaybackTraceSink(controller)] + ([PreviewSink(controller)] if args.show else []),
+            metrics=metrics,
+            before_frame=(lambda: control.apply_pending(controller)) if control is not None else None,
+            max_failures=5,
+            retry_delay=0.1,
+            log_every=100 if args.debug else 0,
+            log_level=logging.DEBUG,
+            tracer=tracer
+        )
+        pipeline.run()
+        if pipeline.consecutive_failures:
+            logging.error("💡 Camera may have disconnected or been claimed by another app")
                 
     except KeyboardInterrupt:
         logging.info("Interrupted by user (Ctrl+C)")
@@ -440,12 +480,21 @@ def main():
         logging.error(f"Error during processing: {e}")
         return 1
     finally:
+        if control is not None:
+            control.stop()
+        if camera is not None:
+            camera.release()
+        elif cap is not None:
+            cap.release()
+        
         # Return to idle state
         logging.info("Returning to IDLE state...")
         controller.set_state("idle")
         
         # Clean up resources
         controller.cleanup()
+        if tracer is not None:
+            tracer.log_summary()
         
         if args.show:
             cv2.destroyAllWindows()
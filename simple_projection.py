@@ -7,11 +7,16 @@ Simple Halloween Hand Detection Projection
 """
 
 import argparse
-import time
 import logging
+import threading
+import time
 import cv2
 import numpy as np
-from ultralytics import YOLO
+
+from projection import (CameraSource, ControlServer, DecodeEngine, HandTriggerPolicy, LatencyTracer, Pipeline,
+                        Presenter, ProjectionMetrics, ProjectionOutput, ProjectionWarp, Sink, StubClassifier,
+                        YoloClassifier, calibrate_corners, is_stub_model, is_synthetic, open_capture,
+                        open_prepared_clip)
 
 # Set up logging
 logging.basicConfig(
@@ -20,29 +25,34 @@ logging.basicConfig(
     datefmt='%H:%M:%S'
 )
 
-class SimpleProjectionController:
-    def __init__(self, video_sleep_path, video_scare_path):
+class SimpleProjectionController(HandTriggerPolicy):
+    def __init__(self, video_sleep_path, video_scare_path, hot_start_frames=30, cache_budget_mb=256,
+                 transcode_cache=None, clip_size=None):
+        super().__init__(confidence_threshold=0.7, scare_duration=2.0)
         self.video_sleep_path = video_sleep_path
         self.video_scare_path = video_scare_path
-        self.state = "idle"
-        self.confidence_threshold = 0.7
-        self.scare_duration = 2.0
-        self.last_trigger = 0.0
         self.debug_mode = True
         self.production_mode = False
         
-        # Load videos
-        self.sleep_cap = cv2.VideoCapture(video_sleep_path)
-        self.scare_cap = cv2.VideoCapture(video_scare_path)
-        
-        if not self.sleep_cap.isOpened():
-            raise Exception(f"Could not open sleep video: {video_sleep_path}")
-        if not self.scare_cap.isOpened():
-            raise Exception(f"Could not open scare video: {video_scare_path}")
+        # Load videos (transcoded versions when prepared; cached in RAM when small,
+        # otherwise hot-start + seek index)
+        try:
+            self.sleep_clip = open_prepared_clip(video_sleep_path, hot_start_frames, cache_budget_mb,
+                                                 transcode_cache, clip_size)
+        except IOError as e:
+            raise Exception(f"Could not open sleep video: {video_sleep_path} ({e})")
+        try:
+            self.scare_clip = open_prepared_clip(video_scare_path, hot_start_frames, cache_budget_mb,
+                                                 transcode_cache, clip_size)
+        except IOError as e:
+            self.sleep_clip.release()
+            raise Exception(f"Could not open scare video: {video_scare_path} ({e})")
         
         # Get video properties
-        self.sleep_fps = self.sleep_cap.get(cv2.CAP_PROP_FPS)
-        self.scare_fps = self.scare_cap.get(cv2.CAP_PROP_FPS)
+        self.sleep_fps = self.sleep_clip.fps
+        self.scare_fps = self.scare_clip.fps
+        
+        self.decode_engine = None  # Set by start_prefetch()
         
         self.sleep_frame_count = 0
         self.scare_frame_count = 0
@@ -53,34 +63,41 @@ class SimpleProjectionController:
         
     def get_current_video_frame(self):
         """Get the current frame based on state"""
+        # Clips loop internally; returned frames are shared, so don't draw on them
+        if self.decode_engine is not None:
+            return self.decode_engine.read(self.state)
         if self.state == "scare":
-            ret, frame = self.scare_cap.read()
-            if not ret:  # Loop back to beginning
-                self.scare_cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
-                ret, frame = self.scare_cap.read()
-            return frame
+            return self.scare_clip.read()
         else:
-            ret, frame = self.sleep_cap.read()
-            if not ret:  # Loop back to beginning
-                self.sleep_cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
-                ret, frame = self.sleep_cap.read()
-            return frame
+            return self.sleep_clip.read()
+    
+    def start_prefetch(self, prepare=None, queue_size=8):
+        """Decode both clips on background threads into bounded frame queues"""
+        self.decode_engine = DecodeEngine(
+            {"idle": self.sleep_clip, "scare": self.scare_clip},
+            prepare=prepare,
+            queue_size=queue_size
+        )
+        self.decode_engine.start()
+        return self.decode_engine
     
     def process_hand_detection(self, class_name, confidence):
         """Process hand detection and update state"""
-        current_time = time.time()
-        
-        if class_name == 'hand' and confidence >= self.confidence_threshold:
-            if self.state != "scare":
-                logging.info(f"🖐️  HAND DETECTED! Confidence: {confidence:.1%}")
-                logging.info("   → Switching to SCARE state")
-                self.state = "scare"
-                self.last_trigger = current_time
-        
-        # Check for scare timeout
-        if self.state == "scare" and current_time - self.last_trigger > self.scare_duration:
-            logging.info("   → SCARE timeout, returning to IDLE")
-            self.state = "idle"
+        return self.update(class_name, confidence)
+    
+    def on_scare(self):
+        """Every scare starts from frame 0"""
+        if self.decode_engine is not None:
+            self.decode_engine.restart("scare")
+        else:
+            self.scare_clip.restart()
+    
+    def release(self):
+        """Release video resources"""
+        if self.decode_engine is not None:
+            self.decode_engine.stop()
+        self.sleep_clip.release()
+        self.scare_clip.release()
     
     def toggle_debug_mode(self):
         """Toggle between debug and projection modes"""
@@ -96,20 +113,16 @@ class SimpleProjectionController:
         logging.info(f"🔄 Switched to {mode} display mode")
         return self.production_mode
     
-    def create_debug_display(self, camera_frame, video_frame, class_name, confidence, model_name="Colin1.pt"):
-        """Create debug display with camera feed and info overlay"""
-        # Resize camera frame for corner display
+    def draw_debug_overlay(self, display, camera_frame, class_name, confidence, model_name="Colin1.pt"):
+        """Draw the camera feed and info overlay onto display (in place, at any output size)"""
+        # Resize camera frame for corner display (30% of the output width)
         cam_h, cam_w = camera_frame.shape[:2]
-        scale = 0.3
+        display_h, display_w = display.shape[:2]
+        scale = 0.3 * display_w / cam_w
         small_cam = cv2.resize(camera_frame, (int(cam_w * scale), int(cam_h * scale)))
         
-        # Use video frame as background - ensure it's the right size
-        display_h, display_w = camera_frame.shape[:2]  # Use camera resolution
-        display = cv2.resize(video_frame, (display_w, display_h))
-        
         # Overlay camera feed in top-right corner
         cam_h_small, cam_w_small = small_cam.shape[:2]
-        display_h, display_w = display.shape[:2]
         
         # Position in top-right corner
         y_offset = 20
@@ -160,30 +173,110 @@ class SimpleProjectionController:
         
         return display
     
+
+class ProjectionSink(Sink):
+    """Renders the current video frame to every output and hands them to the presenter"""
+    name = "composite"
+    
+    def __init__(self, controller, presenter, metrics, outputs, model_name="Colin1.pt", decode_queue=8):
+        self.controller = controller
+        self.presenter = presenter
+        self.metrics = metrics
+        self.outputs = list(outputs)
+        self.model_name = model_name
+        self.decode_queue = decode_queue
+        self.prefetch_scaled = False
+        self.pending_traces = []  # Trigger traces waiting for their first rendered scare frame
+        self._resolved = False
     
-    def create_production_display(self, video_frame):
-        """Create production display with different sizing to minimize grey border"""
-        h, w = video_frame.shape[:2]
+    def output_mode(self, output):
+        """(debug, production) for an output; 'auto' outputs follow the D/P toggles (debug wins)"""
+        return output.effective_mode(self.controller.debug_mode, self.controller.production_mode)
+    
+    def consume(self, packet):
+        controller = self.controller
+        camera_frame = packet.frame
         
-        # Try stretching the video slightly taller to fill potential grey space
-        stretched_h = int(h * 1.1)
-        production_frame = cv2.resize(video_frame, (w, stretched_h))
+        if not self._resolved:
+            cam_h, cam_w = camera_frame.shape[:2]
+            for output in self.outputs:
+                output.resolve((cam_w, cam_h))
+            self._resolved = True
         
-        # Crop back to original height from the middle
-        crop_start = (stretched_h - h) // 2
-        production_frame = production_frame[crop_start:crop_start + h, :]
+        # Start background decoders once the output sizes are known. The decoder
+        # threads also scale every output (resize or warp remap), so each queued
+        # item is one frame per output, all fresh since the queue holds several.
+        if self.decode_queue > 0 and controller.decode_engine is None:
+            outputs = self.outputs
+            prepare = lambda frame: tuple(output.scale(frame, self.output_mode(output)[1], fresh=True)
+                                          for output in outputs)
+            engine = controller.start_prefetch(prepare, self.decode_queue)
+            self.prefetch_scaled = True
+            self.metrics.add_source(engine.stats)
         
-        return production_frame
+        # A trigger's trace waits for the first frame actually rendered after it
+        # (the decoder can time out right after the scare restart)
+        if packet.trace is not None:
+            self.pending_traces.append(packet.trace)
+        
+        # One decoded frame shared by every output (or one already scaled per output)
+        video_frame = controller.get_current_video_frame()
+        if video_frame is None:
+            self.metrics.skip("video_read")
+            return
+        prepared = self.prefetch_scaled and controller.decode_engine is not None
+        
+        for i, output in enumerate(self.outputs):
+            start = time.perf_counter()
+            debug, production = self.output_mode(output)
+            overlay = None
+            if debug:
+                overlay = lambda display: controller.draw_debug_overlay(display, camera_frame, packet.class_name,
+                                                                        packet.confidence, self.model_name)
+            source = video_frame[i] if prepared else video_frame
+            display_frame = output.render(source, debug, production, overlay, prepared)
+            
+            # Latency tracing follows the first scare frame on the main output
+            on_present = None
+            if i == 0 and self.pending_traces:
+                on_present = self._submit_traces(time.perf_counter())
+            self.presenter.submit(display_frame, output.window_name, on_present)
+            self.metrics.observe(f"output_{output.name}", time.perf_counter() - start)
+    
+    def _submit_traces(self, now):
+        """Mark pending traces as handed to the presenter; returns their on_present callback"""
+        traces, self.pending_traces = self.pending_traces, []
+        for trace in traces:
+            trace.submitted(now)
+        
+        def on_present(presented_at):
+            for trace in traces:
+                trace.presented(presented_at)
+        return on_present
     
 
 def main():
     parser = argparse.ArgumentParser(description="Simple Halloween Hand Detection Projection")
-    parser.add_argument("--model", default="Colin1.pt", help="YOLO model file")
-    parser.add_argument("--source", default=0, help="Camera index")
+    parser.add_argument("--model", default="Colin1.pt", help="YOLO model file (or stub[:latency_ms] for load tests)")
+    parser.add_argument("--source", default=0, help="Camera index, video file or synthetic[:WxH][@FPS][?options]")
     parser.add_argument("--video-sleep", default="videos/sleeping_face.mp4", help="Sleep video")
     parser.add_argument("--video-scare", default="videos/angry_face.mp4", help="Scare video")
     parser.add_argument("--conf", type=float, default=0.7, help="Hand detection confidence threshold")
     parser.add_argument("--fullscreen", action="store_true", help="Start in fullscreen mode")
+    parser.add_argument("--display-hz", type=float, default=60.0, help="Display refresh rate to pace presentation to")
+    parser.add_argument("--clip-cache-mb", type=int, default=256, help="Decode clips up to this size fully into RAM")
+    parser.add_argument("--decode-queue", type=int, default=8, help="Frames prefetched per clip by background decoders (0 = decode in render loop)")
+    parser.add_argument("--hot-start-frames", type=int, default=30, help="Frames buffered for instant restart of larger clips")
+    parser.add_argument("--control-port", type=int, help="Serve metrics/live control on this local port (disabled by default)")
+    parser.add_argument("--warp", help="Projection warp calibration JSON (keystone/mesh correction)")
+    parser.add_argument("--calibrate-warp", metavar="FILE", help="Interactively calibrate keystone corners and save to FILE")
+    parser.add_argument("--warp-cache", default=".warp_cache", help="Directory for cached warp maps")
+    parser.add_argument("--control-host", default="127.0.0.1", help="Interface for the control endpoint")
+    parser.add_argument("--transcode-cache", default=".clip_cache",
+                        help="Directory of clips prepared by scripts/prepare_clips.py ('' = always use the originals)")
+    parser.add_argument("--output", action="append", metavar="SPEC",
+                        help="Output display, e.g. 'name=hallway,size=1280x720,mode=debug,crop=0:0:1:0.8,warp=FILE' "
+                             "(repeatable; the first one is the main window)")
     
     args = parser.parse_args()
     
@@ -193,28 +286,30 @@ def main():
     
     # Load YOLO model
     try:
-        logging.info(f"Loading YOLO model: {args.model}")
-        model = YOLO(args.model)
-        logging.info(f"✓ Model loaded: {model.names}")
+        if is_stub_model(args.model):
+            classifier = StubClassifier.from_spec(args.model)
+        else:
+            # Imported here so stub runs, tests and benchmarks work without ultralytics installed
+            from ultralytics import YOLO
+            logging.info(f"Loading YOLO model: {args.model}")
+            model = YOLO(args.model)
+            logging.info(f"✓ Model loaded: {model.names}")
+            classifier = YoloClassifier(model)
     except Exception as e:
         logging.error(f"Failed to load YOLO model: {e}")
         return 1
     
-    # Initialize projection controller
-    try:
-        controller = SimpleProjectionController(args.video_sleep, args.video_scare)
-        controller.confidence_threshold = args.conf
-    except Exception as e:
-        logging.error(f"Failed to initialize controller: {e}")
-        return 1
-    
     # Set up camera
     try:
         source = int(args.source)
     except ValueError:
         source = args.source
     
-    cap = cv2.VideoCapture(source)
+    try:
+        cap = open_capture(source)
+    except ValueError as e:
+        logging.error(f"Invalid synthetic source: {e}")
+        return 1
     if not cap.isOpened():
         logging.error(f"Could not open camera: {source}")
         return 1
@@ -228,105 +323,161 @@ def main():
     logging.info("  Q/ESC = Quit")
     logging.info("-" * 60)
     
-    # Create display window
+    # Outputs: the main window plus any extra displays, all fed from one decode and one inference
+    try:
+        if args.output:
+            outputs = [ProjectionOutput.from_spec(spec, f"output{i + 1}", warp_cache=args.warp_cache)
+                       for i, spec in enumerate(args.output)]
+        else:
+            outputs = [ProjectionOutput("main", fullscreen=args.fullscreen)]
+        if args.warp and not args.calibrate_warp and outputs[0].warp is None:
+            outputs[0].warp = ProjectionWarp.from_file(args.warp, cache_dir=args.warp_cache)
+    except (OSError, ValueError) as e:
+        logging.error(f"Invalid --output/--warp: {e}")
+        cap.release()
+        return 1
+    
+    # Initialize projection controller (with transcoded clips sized for the main output, if prepared)
+    camera_size = (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+    clip_size = outputs[0].native_source_size(camera_size) if all(outputs[0].size or camera_size) else None
+    try:
+        controller = SimpleProjectionController(args.video_sleep, args.video_scare,
+                                                hot_start_frames=args.hot_start_frames,
+                                                cache_budget_mb=args.clip_cache_mb,
+                                                transcode_cache=args.transcode_cache,
+                                                clip_size=clip_size)
+        controller.confidence_threshold = args.conf
+    except Exception as e:
+        logging.error(f"Failed to initialize controller: {e}")
+        cap.release()
+        return 1
+    
+    # Optional metrics/control endpoint
+    def current_settings():
+        return {
+            'confidence_threshold': controller.confidence_threshold,
+            'scare_duration': controller.scare_duration,
+            'debug_mode': controller.debug_mode,
+            'production_mode': controller.production_mode,
+        }
+    
+    metrics = ProjectionMetrics()
+    control = None
+    presenter = None
+    
+    def abort_setup():
+        """Release what setup has opened so far; returns the exit code"""
+        if control is not None:
+            control.stop()
+        controller.release()
+        cap.release()
+        if presenter is not None:
+            cv2.destroyAllWindows()
+        return 1
+    
+    if args.control_port:
+        control = ControlServer(metrics, host=args.control_host, port=args.control_port,
+                                settings=current_settings)
+        try:
+            control.start()
+        except OSError as e:
+            logging.error(f"Could not start control endpoint on port {args.control_port}: {e}")
+            return abort_setup()
+        metrics.add_source(current_settings)
+    
+    # Create display windows (presenter owns them, plus fullscreen and key handling)
     window_name = "Halloween Projection"
-    cv2.namedWindow(window_name, cv2.WINDOW_NORMAL)
     
-    if args.fullscreen:
-        cv2.setWindowProperty(window_name, cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN)
+    def handle_key(key):
+        if key in [ord('d'), ord('D')]:  # Toggle debug mode
+            controller.toggle_debug_mode()
+        elif key in [ord('p'), ord('P')]:  # Toggle production mode
+            controller.toggle_production_mode()
+    
+    presenter = Presenter(window_name, refresh_hz=args.display_hz,
+                          fullscreen=args.fullscreen or outputs[0].fullscreen, on_key=handle_key)
+    outputs[0].window_name = window_name
+    for output in outputs[1:]:
+        output.window_name = f"{window_name} - {output.name}"
+        presenter.add_window(output.window_name, fullscreen=output.fullscreen)
+    presenter.open()
+    metrics.add_source(presenter.stats)
+    
+    # Optional projection warp for the main output (replaces the stretch/crop grey-border fix)
+    if args.calibrate_warp or any(output.warp is not None for output in outputs):
+        ret, first_frame = cap.read()
+        if not ret:
+            logging.error("Could not read a camera frame to size the projection warp")
+            return abort_setup()
+        for output in outputs:
+            output.resolve((first_frame.shape[1], first_frame.shape[0]))
+        main_output = outputs[0]
+        try:
+            if args.calibrate_warp:
+                main_output.warp = calibrate_corners(window_name, main_output.size, cache_dir=args.warp_cache)
+                if main_output.warp is not None:
+                    main_output.warp.save(args.calibrate_warp)
+        except (OSError, ValueError) as e:
+            logging.error(f"Failed to set up projection warp: {e}")
+            return abort_setup()
+        
+        # Precompute remap tables for both clips up front
+        for output in outputs:
+            if output.warp is not None:
+                for clip in (controller.sleep_clip, controller.scare_clip):
+                    output.prepare_maps(clip.width, clip.height)
+                logging.info(f"✅ Projection warp active on {output.name} ({output.size[0]}x{output.size[1]})")
+    
+    if len(outputs) > 1:
+        for output in outputs:
+            size = f"{output.size[0]}x{output.size[1]}" if output.size else "camera size"
+            logging.info(f"🖥️  Output {output.name}: {size}, mode={output.mode}"
+                         f"{', warped' if output.warp is not None else ''}{', cropped' if output.crop else ''}")
+    
+    # Trace every trigger from camera capture to the first scare frame on screen
+    tracer = LatencyTracer()
+    metrics.add_source(tracer.stats)
+    
+    # Build the pipeline: camera → YOLO → state machine → projector window
+    camera = CameraSource(cap, threaded=isinstance(source, int) or is_synthetic(source))
+    pipeline = Pipeline(
+        camera,
+        classifier,
+        controller,
+        [ProjectionSink(controller, presenter, metrics, outputs, args.model, args.decode_queue)],
+        metrics=metrics,
+        before_frame=(lambda: control.apply_pending(controller)) if control is not None else None,
+        log_every=30,
+        tracer=tracer
+    )
+    
+    def run_worker():
+        try:
+            pipeline.run()
+        except Exception as e:
+            logging.error(f"Render loop failed: {e}")
+        finally:
+            presenter.stop()
+    
+    worker = threading.Thread(target=run_worker, name="render-loop", daemon=True)
+    worker.start()
     
     try:
-        while True:
-            # Read camera frame
-            ret, camera_frame = cap.read()
-            if not ret:
-                logging.warning("Failed to read camera frame")
-                continue
-            
-            # Get current video frame
-            video_frame = controller.get_current_video_frame()
-            if video_frame is None:
-                continue
-            
-            # Resize video frame to exactly match camera resolution, adding extra height to eliminate grey
-            cam_h, cam_w = camera_frame.shape[:2]
-            # Add 15% extra height to ensure no grey top border
-            extended_h = int(cam_h * 1.15)
-            video_frame = cv2.resize(video_frame, (cam_w, extended_h))
-            
-            # Crop from bottom to keep original height but eliminate grey at top
-            video_frame = video_frame[:cam_h, :]
-            
-            # Run YOLO classification on camera frame
-            results = model.predict(camera_frame, verbose=False)
-            
-            class_name = "not_hand"
-            confidence = 0.0
-            
-            if results and len(results) > 0:
-                result = results[0]
-                # Handle classification results (not detection)
-                if hasattr(result, 'probs') and result.probs is not None:
-                    # Classification model - get class probabilities
-                    probs = result.probs.data.cpu().numpy()
-                    max_idx = probs.argmax()
-                    confidence = probs[max_idx]
-                    class_name = model.names[int(max_idx)]
-                else:
-                    # Fallback: try to get from names/classes if available
-                    try:
-                        # Sometimes classification results are in different format
-                        class_name = "not_hand"
-                        confidence = 0.5
-                    except:
-                        pass
-                
-                # Debug: print classification every 30 frames
-                if not hasattr(controller, 'frame_count'):
-                    controller.frame_count = 0
-                controller.frame_count += 1
-                if controller.frame_count % 30 == 0:
-                    logging.info(f"🔍 Classification: {class_name} ({confidence:.1%})")
-            
-            # Process detection
-            controller.process_hand_detection(class_name, confidence)
-            
-            # Create display based on mode
-            if controller.debug_mode:
-                display_frame = controller.create_debug_display(camera_frame, video_frame, class_name, confidence, args.model)
-            elif controller.production_mode:
-                display_frame = controller.create_production_display(video_frame)
-            else:
-                display_frame = video_frame
-            
-            # Show frame
-            cv2.imshow(window_name, display_frame)
-            
-            # Handle key presses
-            key = cv2.waitKey(1) & 0xFF
-            if key in [ord('q'), ord('Q'), 27]:  # Q or ESC
-                break
-            elif key in [ord('d'), ord('D')]:  # Toggle debug mode
-                controller.toggle_debug_mode()
-            elif key in [ord('p'), ord('P')]:  # Toggle production mode
-                controller.toggle_production_mode()
-            elif key in [ord('f'), ord('F')]:  # Toggle fullscreen
-                current_state = cv2.getWindowProperty(window_name, cv2.WND_PROP_FULLSCREEN)
-                if current_state == cv2.WINDOW_FULLSCREEN:
-                    cv2.setWindowProperty(window_name, cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_NORMAL)
-                    logging.info("🔄 Switched to windowed mode")
-                else:
-                    cv2.setWindowProperty(window_name, cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN)
-                    logging.info("🔄 Switched to fullscreen mode")
+        presenter.run()
     
     except KeyboardInterrupt:
         logging.info("Shutting down...")
     
     finally:
-        cap.release()
-        controller.sleep_cap.release()
-        controller.scare_cap.release()
+        pipeline.stop()
+        presenter.stop()
+        worker.join(timeout=2.0)
+        if control is not None:
+            control.stop()
+        camera.release()
+        controller.release()
         cv2.destroyAllWindows()
+        tracer.log_summary()
         logging.info("✅ Cleanup complete")
 
 if __name__ == "__main__":
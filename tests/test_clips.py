@@ -0,0 +1,55 @@
+import os
+
+import cv2
+import numpy as np
+import pytest
+
+from projection import CachedClip, HotStartClip, SeekIndex, open_clip
+
+
+def test_seek_index_always_starts_at_zero():
+    assert SeekIndex([]).keyframes == [0]
+    assert SeekIndex([48, 24, 24]).keyframes == [0, 24, 48]
+
+
+@pytest.mark.parametrize("frame, expected", [(0, 0), (23, 0), (24, 24), (30, 24), (48, 48), (1000, 48)])
+def test_keyframe_before(frame, expected):
+    assert SeekIndex([0, 24, 48]).keyframe_before(frame) == expected
+
+
+@pytest.fixture
+def numbered_clip(tmp_path):
+    """40-frame MJPG clip whose frame i is filled with brightness 5 * i"""
+    path = str(tmp_path / "numbered.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 30.0, (32, 24))
+    if not writer.isOpened():
+        pytest.skip("No MJPG writer in this OpenCV build")
+    for i in range(40):
+        writer.write(np.full((24, 32, 3), 5 * i, dtype=np.uint8))
+    writer.release()
+    assert os.path.getsize(path) > 0
+    return path
+
+
+def frame_number(frame):
+    return int(round(frame.mean() / 5))
+
+
+def test_cached_clip_loops_and_restarts(numbered_clip):
+    clip = open_clip(numbered_clip, cache_budget_mb=64)
+    assert isinstance(clip, CachedClip)
+    assert [frame_number(clip.read()) for _ in range(42)][-3:] == [39, 0, 1]
+    clip.restart()
+    assert frame_number(clip.read()) == 0
+
+
+def test_hot_start_clip_restarts_from_frame_zero(numbered_clip):
+    clip = open_clip(numbered_clip, hot_frames=5, cache_budget_mb=0, index=SeekIndex(range(40)))
+    assert isinstance(clip, HotStartClip)
+    assert [frame_number(clip.read()) for _ in range(12)] == list(range(12))
+    clip.restart()
+    assert [frame_number(clip.read()) for _ in range(8)] == list(range(8))  # Hot buffer, then the seeked decoder
+    for _ in range(40):
+        clip.read()
+    assert frame_number(clip.read()) == 8  # Looped through the end of the clip
+    clip.release()
@@ -0,0 +1,65 @@
+import pytest
+
+from projection import ControlServer, ProjectionMetrics
+
+
+def make_server(**kwargs):
+    return ControlServer(ProjectionMetrics(), **kwargs)
+
+
+def test_parse_changes_from_query_json_and_form():
+    server = make_server()
+    assert server._parse_changes("debug_mode=0", "", "") == {"debug_mode": False}
+    assert server._parse_changes("", '{"confidence_threshold": 0.6, "scare_duration": 3}', "application/json") == {
+        "confidence_threshold": 0.6,
+        "scare_duration": 3.0,
+    }
+    assert server._parse_changes("", "production_mode=on", "application/x-www-form-urlencoded") == {
+        "production_mode": True
+    }
+
+
+def test_body_overrides_query():
+    server = make_server()
+    changes = server._parse_changes("scare_duration=1", '{"scare_duration": 4}', "application/json")
+    assert changes == {"scare_duration": 4.0}
+
+
+@pytest.mark.parametrize("query", [
+    "confidence_threshold=1.5",
+    "scare_duration=0",
+    "debug_mode=maybe",
+    "volume=11",
+    "",
+])
+def test_parse_changes_rejects_bad_input(query):
+    with pytest.raises(ValueError):
+        make_server()._parse_changes(query, "", "")
+
+
+def test_settings_outside_allowed_are_rejected():
+    server = make_server(allowed=("confidence_threshold", "scare_duration"))
+    assert server._parse_changes("scare_duration=3", "", "") == {"scare_duration": 3.0}
+    with pytest.raises(ValueError, match="debug_mode"):
+        server._parse_changes("debug_mode=1", "", "")
+    with pytest.raises(ValueError, match="production_mode"):
+        server._parse_changes("scare_duration=3&production_mode=1", "", "")
+
+
+def test_allowed_must_name_known_settings():
+    with pytest.raises(ValueError, match="volume"):
+        make_server(allowed=("confidence_threshold", "volume"))
+
+
+def test_apply_pending_sets_attributes():
+    class Target:
+        confidence_threshold = 0.7
+        scare_duration = 2.0
+
+    server = make_server()
+    server.pending.put(server._parse_changes("confidence_threshold=0.5", "", ""))
+    server.pending.put(server._parse_changes("scare_duration=4", "", ""))
+    target = Target()
+    assert server.apply_pending(target) == 2
+    assert (target.confidence_threshold, target.scare_duration) == (0.5, 4.0)
+    assert server.apply_pending(target) == 0
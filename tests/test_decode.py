@@ -0,0 +1,97 @@
+import threading
+
+import pytest
+
+from projection.decode import PrefetchDecoder
+
+
+class FakeClip:
+    """Frames are (restarts so far, index); decoding blocks once `available` frames were read"""
+
+    def __init__(self, available=None):
+        self.available = available
+        self.restarts = 0
+        self.index = 0
+        self.served = 0
+        self.more = threading.Event()
+
+    def read(self):
+        if self.available is not None and self.served >= self.available:
+            self.more.wait()
+        self.served += 1
+        frame = (self.restarts, self.index)
+        self.index += 1
+        return frame
+
+    def restart(self):
+        self.restarts += 1
+        self.index = 0
+
+
+@pytest.fixture
+def make_decoder():
+    decoders = []
+
+    def make(clip, queue_size=4, prepare=None):
+        decoder = PrefetchDecoder(clip, "test", prepare=prepare, queue_size=queue_size)
+        decoders.append((decoder, clip))
+        decoder.start()
+        return decoder
+
+    yield make
+    for decoder, clip in decoders:
+        clip.more.set()
+        decoder.stop()
+
+
+def wait_full(decoder, timeout=2.0):
+    tick = threading.Event()
+    for _ in range(int(timeout / 0.01)):
+        if decoder.queue.full():
+            return
+        tick.wait(0.01)
+    raise AssertionError("decoder never filled its queue")
+
+
+def read_ready(decoder, count):
+    """Read frames as the decoder delivers them (reading ahead of it would repeat frames)"""
+    frames = []
+    for _ in range(count):
+        assert decoder.wait_ready()
+        frames.append(decoder.read())
+    return frames
+
+
+def test_frames_are_served_in_order(make_decoder):
+    decoder = make_decoder(FakeClip(), prepare=lambda frame: frame + ("prepared",))
+    assert read_ready(decoder, 10) == [(0, i, "prepared") for i in range(10)]
+    assert decoder.underruns == 0
+
+
+def test_frames_queued_before_restart_are_never_returned(make_decoder):
+    decoder = make_decoder(FakeClip())
+    wait_full(decoder)  # Old frames queued, one more waiting to be put
+    assert decoder.read() == (0, 0)
+
+    decoder.restart()
+    frames = read_ready(decoder, 20)
+    assert frames[0] == (1, 0)  # First frame after restart is frame 0 of the new pass
+    assert frames == [(1, i) for i in range(20)]
+    assert decoder.underruns == 0
+
+
+def test_empty_queue_counts_an_underrun_and_repeats_the_last_frame(make_decoder):
+    decoder = make_decoder(FakeClip(available=2))
+    assert read_ready(decoder, 2) == [(0, 0), (0, 1)]
+    assert decoder.underruns == 0
+    assert decoder.read() == (0, 1)
+    assert decoder.read() == (0, 1)
+    assert decoder.underruns == 2
+
+
+def test_underrun_right_after_restart_repeats_nothing(make_decoder):
+    decoder = make_decoder(FakeClip(available=1))
+    assert read_ready(decoder, 1) == [(0, 0)]
+    decoder.restart()  # Decoder is stalled: frame 0 never arrives within the wait
+    assert decoder.read() is None
+    assert decoder.underruns == 1
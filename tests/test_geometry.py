@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from projection import ProjectionOutput, ProjectionWarp
+
+
+def gradient_frame(width, height):
+    xs = np.linspace(0, 255, width, dtype=np.float32)[None, :].repeat(height, axis=0)
+    ys = np.linspace(0, 255, height, dtype=np.float32)[:, None].repeat(width, axis=1)
+    return np.dstack([xs, ys, np.full_like(xs, 96)]).astype(np.uint8)
+
+
+def test_identity_corners_reproduce_the_frame():
+    frame = gradient_frame(320, 240)
+    warped = ProjectionWarp((320, 240), cache_dir=None).apply(frame)
+    assert warped.shape == frame.shape
+    assert np.abs(warped.astype(int) - frame.astype(int)).max() <= 1
+
+
+def test_apply_cycles_through_the_buffer_ring():
+    frame = gradient_frame(64, 48)
+    warp = ProjectionWarp((64, 48), cache_dir=None, ring_size=3)
+    buffers = [warp.apply(frame) for _ in range(6)]
+    assert len({id(buffer) for buffer in buffers[:3]}) == 3
+    assert [id(buffer) for buffer in buffers[3:]] == [id(buffer) for buffer in buffers[:3]]
+
+
+def test_apply_writes_into_a_given_buffer():
+    frame = gradient_frame(64, 48)
+    warp = ProjectionWarp((32, 24), cache_dir=None)
+    out = warp.new_buffer(frame)
+    assert warp.apply(frame, out) is out
+    assert out.shape == (24, 32, 3)
+
+
+def test_ring_is_reallocated_when_the_output_size_changes():
+    frame = gradient_frame(64, 48)
+    warp = ProjectionWarp((64, 48), cache_dir=None)
+    warp.apply(frame)
+    warp.output_size = (32, 24)
+    assert warp.apply(frame).shape == (24, 32, 3)
+
+
+def test_fresh_scale_never_reuses_buffers():
+    frame = gradient_frame(64, 48)
+    output = ProjectionOutput("warped", (64, 48), warp=ProjectionWarp((64, 48), cache_dir=None, ring_size=1))
+    first = output.scale(frame, fresh=True)
+    second = output.scale(frame, fresh=True)
+    assert first is not second
+    assert first is not output.scale(frame)
+
+
+@pytest.mark.parametrize("warp", [None, ProjectionWarp((64, 48), cache_dir=None)])
+def test_debug_overlay_never_draws_on_shared_frames(warp):
+    frame = gradient_frame(64, 48)
+    original = frame.copy()
+    output = ProjectionOutput("main", (64, 48), crop=(0.0, 0.0, 1.0, 0.87), warp=warp)
+
+    def overlay(display):
+        display[:] = 0
+
+    rendered = output.render(frame, debug=True, overlay=overlay)
+    assert not rendered.any()
+    assert np.array_equal(frame, original)
+
+    prepared = output.scale(frame, fresh=True)
+    kept = prepared.copy()
+    output.render(prepared, debug=True, overlay=overlay, prepared=True)
+    assert np.array_equal(prepared, kept)
@@ -0,0 +1,108 @@
+import cv2
+import numpy as np
+import pytest
+
+from projection import ProjectionOutput, ProjectionWarp
+
+
+# The stretch-and-crop compositing simple_projection.py did before outputs were
+# folded into a single scale (fit_video_frame / create_production_display)
+def legacy_fit(video_frame, cam_w, cam_h):
+    extended_h = int(cam_h * 1.15)
+    return cv2.resize(video_frame, (cam_w, extended_h))[:cam_h, :]
+
+
+def legacy_production(fitted):
+    h, w = fitted.shape[:2]
+    stretched_h = int(h * 1.1)
+    production_frame = cv2.resize(fitted, (w, stretched_h))
+    crop_start = (stretched_h - h) // 2
+    return production_frame[crop_start:crop_start + h, :]
+
+
+def smooth_frame(width, height):
+    xs = np.linspace(0, 255, width, dtype=np.float32)[None, :].repeat(height, axis=0)
+    ys = np.linspace(0, 255, height, dtype=np.float32)[:, None].repeat(width, axis=1)
+    return np.dstack([xs, ys, (xs + ys) / 2]).astype(np.uint8)
+
+
+def mean_difference(a, b):
+    return np.abs(a.astype(np.int16) - b.astype(np.int16)).mean()
+
+
+SIZES = [
+    ((1280, 720), (1280, 720)),   # Clip at camera size
+    ((1920, 1080), (1280, 720)),  # Downscale
+    ((640, 360), (1920, 1080)),   # Upscale
+    ((640, 480), (1280, 720)),    # Different aspect ratio
+]
+
+
+@pytest.mark.parametrize("clip_size, camera_size", SIZES)
+def test_scale_matches_the_old_fit(clip_size, camera_size):
+    video_frame = smooth_frame(*clip_size)
+    output = ProjectionOutput("main", camera_size)
+    scaled = output.scale(video_frame)
+    expected = legacy_fit(video_frame, *camera_size)
+    assert scaled.shape == expected.shape
+    assert mean_difference(scaled, expected) < 2.0
+
+
+@pytest.mark.parametrize("clip_size, camera_size", SIZES)
+def test_production_scale_matches_the_old_stretch(clip_size, camera_size):
+    video_frame = smooth_frame(*clip_size)
+    output = ProjectionOutput("main", camera_size)
+    scaled = output.scale(video_frame, production=True)
+    expected = legacy_production(legacy_fit(video_frame, *camera_size))
+    assert scaled.shape == expected.shape
+    assert mean_difference(scaled, expected) < 2.0
+
+
+def test_source_rect_keeps_the_old_rows():
+    output = ProjectionOutput("main", (1280, 720))
+    # 1080 rows shown 15% taller, top 720/828 of them kept
+    assert output.source_rect(1920, 1080) == (0, 0, 1920, 939)
+    # Production: a further 10% taller, centred
+    assert output.source_rect(1920, 1080, production=True) == (0, 42, 1920, 854)
+
+
+def test_source_rect_applies_crop_before_the_grey_fix():
+    output = ProjectionOutput("hallway", (640, 360), crop=(0.25, 0.5, 0.5, 0.5))
+    assert output.source_rect(1000, 800) == (250, 400, 500, 348)
+
+
+def test_warped_outputs_skip_the_grey_fix():
+    output = ProjectionOutput("projector", (640, 360), warp=ProjectionWarp((640, 360), cache_dir=None))
+    assert output.source_rect(1920, 1080, production=True) == (0, 0, 1920, 1080)
+
+
+@pytest.mark.parametrize("mode, toggles, expected", [
+    ("auto", (False, False), (False, False)),
+    ("auto", (True, False), (True, False)),
+    ("auto", (False, True), (False, True)),
+    ("auto", (True, True), (True, False)),  # Debug wins: no production stretch under the overlay
+    ("clean", (True, True), (False, False)),
+    ("debug", (False, True), (True, False)),
+    ("production", (True, False), (False, True)),
+])
+def test_effective_mode(mode, toggles, expected):
+    assert ProjectionOutput("main", mode=mode).effective_mode(*toggles) == expected
+
+
+def test_from_spec():
+    output = ProjectionOutput.from_spec("name=hallway, size=1280x720, mode=debug, crop=0:0.1:1:0.8, fullscreen=1")
+    assert (output.name, output.size, output.mode) == ("hallway", (1280, 720), "debug")
+    assert output.crop == (0.0, 0.1, 1.0, 0.8)
+    assert output.fullscreen
+
+
+@pytest.mark.parametrize("spec", ["size=1280", "mode=loud", "crop=0:0:1", "crop=0.5:0:1:1", "volume=3", "size"])
+def test_from_spec_rejects_bad_specs(spec):
+    with pytest.raises(ValueError):
+        ProjectionOutput.from_spec(spec)
+
+
+def test_native_source_size_undoes_crop_and_grey_fix():
+    output = ProjectionOutput("main", (1280, 720), crop=(0.0, 0.0, 0.5, 1.0))
+    assert output.native_source_size() == (2560, 828)
+    assert ProjectionOutput("main").native_source_size((640, 480)) == (640, 552)
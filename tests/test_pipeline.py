@@ -0,0 +1,115 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from projection import CameraSource, HandTriggerPolicy, Pipeline, Sink, StubClassifier
+
+
+class DropoutCapture:
+    """30 FPS camera stand-in that fails every read during [start, start + duration)"""
+
+    def __init__(self, start=0.3, duration=0.3):
+        self.start = start
+        self.duration = duration
+        self.began = time.perf_counter()
+        self.frame = np.zeros((48, 64, 3), dtype=np.uint8)
+
+    def read(self):
+        time.sleep(1 / 30)
+        elapsed = time.perf_counter() - self.began
+        if self.start <= elapsed < self.start + self.duration:
+            return False, None
+        return True, self.frame
+
+    def release(self):
+        pass
+
+
+class StopAfter(Sink):
+    """Stops the pipeline once frames arrive after the dropout"""
+
+    name = "stop_after"
+
+    def __init__(self, capture, frames_after_dropout=5):
+        self.capture = capture
+        self.frames_after_dropout = frames_after_dropout
+        self.after = 0
+
+    def consume(self, packet):
+        if time.perf_counter() - self.capture.began >= self.capture.start + self.capture.duration:
+            self.after += 1
+        return self.after < self.frames_after_dropout
+
+
+def run_pipeline(capture, threaded, retry_delay, timeout=5.0):
+    sink = StopAfter(capture)
+    source = CameraSource(capture, threaded=threaded, retry_delay=retry_delay)
+    pipeline = Pipeline(source, StubClassifier(), HandTriggerPolicy(), [sink],
+                        max_failures=5, retry_delay=retry_delay)
+    thread = threading.Thread(target=pipeline.run, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    pipeline.stop()
+    thread.join(1.0)
+    source.release()
+    return pipeline, sink
+
+
+@pytest.mark.parametrize("threaded", [False, True])
+def test_brief_camera_dropout_does_not_stop_the_pipeline(threaded):
+    pipeline, sink = run_pipeline(DropoutCapture(duration=0.3), threaded, retry_delay=0.1)
+    assert sink.after == sink.frames_after_dropout  # Stopped by the sink, not by read failures
+    assert pipeline.consecutive_failures == 0
+
+
+@pytest.mark.parametrize("threaded", [False, True])
+def test_lasting_camera_dropout_stops_the_pipeline(threaded):
+    pipeline, sink = run_pipeline(DropoutCapture(duration=60.0), threaded, retry_delay=0.1)
+    assert pipeline.stopped.is_set()
+    assert pipeline.consecutive_failures >= 5
+    assert sink.after == 0
+
+
+class RecordingPolicy(HandTriggerPolicy):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.events = []
+
+    def on_scare(self):
+        self.events.append("scare")
+
+    def on_idle(self):
+        self.events.append("idle")
+
+
+def test_confident_hand_triggers_once():
+    policy = RecordingPolicy(confidence_threshold=0.7, scare_duration=2.0)
+    assert not policy.update("hand", 0.69, now=0.0)
+    assert not policy.update("not_hand", 0.99, now=0.1)
+    assert policy.update("hand", 0.7, now=0.2)
+    assert policy.state == "scare"
+    assert policy.triggered_at is not None
+    assert not policy.update("hand", 0.99, now=0.3)  # Already scaring
+    assert policy.events == ["scare"]
+
+
+def test_scare_times_out_to_idle():
+    policy = RecordingPolicy(scare_duration=2.0)
+    policy.update("hand", 0.9, now=10.0)
+    policy.update("not_hand", 0.9, now=12.0)
+    assert policy.state == "scare"
+    policy.update("not_hand", 0.9, now=12.1)
+    assert policy.state == "idle"
+    assert policy.events == ["scare", "idle"]
+
+
+def test_debounce_delays_retrigger():
+    policy = RecordingPolicy(scare_duration=1.0, debounce_time=0.5)
+    policy.update("hand", 0.9, now=10.0)
+    policy.update("not_hand", 0.9, now=11.1)
+    assert policy.state == "idle"
+    assert not policy.update("hand", 0.9, now=11.3)  # Within debounce of the return to idle
+    assert policy.update("hand", 0.9, now=11.7)
+    assert policy.events == ["scare", "idle", "scare"]
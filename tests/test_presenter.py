@@ -0,0 +1,66 @@
+import cv2
+
+from projection import Presenter
+from projection.presenter import FrameMailbox
+
+
+def test_take_reports_fresh_frames_once():
+    mailbox = FrameMailbox()
+    assert mailbox.take() == (None, False, [])
+    mailbox.submit("a")
+    assert mailbox.take() == ("a", True, [])
+    assert mailbox.take() == ("a", False, [])  # Nothing new: the last frame again
+    assert mailbox.dropped == 0
+
+
+def test_replaced_frames_count_as_dropped():
+    mailbox = FrameMailbox()
+    for frame in "abc":
+        mailbox.submit(frame)
+    assert mailbox.take()[:2] == ("c", True)
+    assert mailbox.dropped == 2
+    mailbox.submit("d")  # Previous frame was taken: not a drop
+    assert mailbox.dropped == 2
+
+
+def test_callbacks_of_a_dropped_frame_move_to_its_replacement():
+    mailbox = FrameMailbox()
+    seen = []
+    mailbox.submit("a", lambda now: seen.append(("a", now)))
+    mailbox.submit("b")
+    mailbox.submit("c", lambda now: seen.append(("c", now)))
+    frame, fresh, callbacks = mailbox.take()
+    assert (frame, fresh, len(callbacks)) == ("c", True, 2)
+    for on_present in callbacks:
+        on_present(1.0)
+    assert seen == [("a", 1.0), ("c", 1.0)]
+    assert mailbox.take()[2] == []  # Callbacks fire once
+
+
+def test_submit_routes_to_windows_and_stats_sum_them():
+    presenter = Presenter("main")
+    presenter.add_window("side")
+    presenter.submit("a")
+    presenter.submit("b")
+    presenter.submit("x", "side")
+    assert presenter.windows["main"].mailbox.take()[0] == "b"
+    assert presenter.windows["side"].mailbox.take()[0] == "x"
+    stats = presenter.stats()
+    assert stats["present_windows"] == 2
+    assert stats["present_dropped_frames"] == 1
+
+
+def test_run_presents_fresh_frames_and_counts_duplicates(monkeypatch):
+    presenter = Presenter("main", refresh_hz=1000.0)
+    shown = []
+    presented_at = []
+    keys = iter([255, 255, 255, ord("q")])
+    monkeypatch.setattr(cv2, "imshow", lambda name, frame: shown.append((name, frame)))
+    monkeypatch.setattr(cv2, "waitKey", lambda delay: next(keys))
+
+    presenter.submit("a", on_present=presented_at.append)
+    presenter.run()  # Four ticks: one fresh frame, then it stays on screen
+
+    assert shown == [("main", "a")]
+    assert len(presented_at) == 1
+    assert (presenter.presented, presenter.duplicated) == (1, 3)
@@ -0,0 +1,114 @@
+import time
+
+import numpy as np
+
+from projection import FramePacket, LatencyTracer, Presenter, ProjectionMetrics, ProjectionOutput, ProjectionWarp
+from simple_projection import ProjectionSink
+
+
+class FakeController:
+    """Serves queued video frames (None = decoder timed out) like SimpleProjectionController"""
+
+    def __init__(self, frames):
+        self.frames = list(frames)
+        self.decode_engine = None
+        self.debug_mode = False
+        self.production_mode = False
+        self.state = "scare"
+
+    def get_current_video_frame(self):
+        frame = self.frames.pop(0)
+        if self.decode_engine is not None and frame is not None:
+            return self.decode_engine.prepare(frame)  # What a decoder thread would have queued
+        return frame
+
+    def start_prefetch(self, prepare=None, queue_size=8):
+        self.decode_engine = FakeEngine(prepare)
+        return self.decode_engine
+
+
+class FakeEngine:
+    def __init__(self, prepare):
+        self.prepare = prepare
+
+    def stats(self):
+        return {}
+
+
+def make_sink(frames):
+    presenter = Presenter("main")
+    output = ProjectionOutput("main", (64, 48))
+    output.window_name = "main"
+    sink = ProjectionSink(FakeController(frames), presenter, ProjectionMetrics(), [output], decode_queue=0)
+    return sink, presenter
+
+
+def triggered_packet(tracer, index):
+    now = time.perf_counter()
+    packet = FramePacket(index, np.zeros((48, 64, 3), dtype=np.uint8), now)
+    packet.inferred_at = packet.decided_at = now
+    packet.triggered = True
+    packet.trace = tracer.begin(packet)
+    return packet
+
+
+def present(presenter):
+    frame, fresh, callbacks = presenter.mailbox.take()
+    for on_present in callbacks:
+        on_present(time.perf_counter())
+    return fresh
+
+
+def test_trace_completes_on_the_next_rendered_frame_after_a_decoder_timeout():
+    frame = np.zeros((48, 64, 3), dtype=np.uint8)
+    sink, presenter = make_sink([None, frame])
+    tracer = LatencyTracer(log_each=False)
+
+    sink.consume(triggered_packet(tracer, 1))  # Decoder timed out: nothing rendered
+    assert not present(presenter)
+    assert tracer.completed == 0
+
+    sink.consume(FramePacket(2, frame, time.perf_counter()))
+    assert present(presenter)
+    assert tracer.completed == 1
+    assert not sink.pending_traces
+
+
+def test_trace_completes_when_its_own_frame_is_presented():
+    frame = np.zeros((48, 64, 3), dtype=np.uint8)
+    sink, presenter = make_sink([frame])
+    tracer = LatencyTracer(log_each=False)
+    sink.consume(triggered_packet(tracer, 1))
+    assert tracer.completed == 0  # Handed over, not shown yet
+    present(presenter)
+    assert tracer.completed == 1
+    trace = tracer.traces[0]
+    assert trace.decided_at <= trace.submitted_at <= trace.presented_at
+
+
+def test_decoder_threads_scale_every_output_of_a_fan_out():
+    presenter = Presenter("main")
+    outputs = [ProjectionOutput("main", (64, 48)),
+               ProjectionOutput("hallway", (32, 24), mode="clean", crop=(0.0, 0.25, 1.0, 0.5)),
+               ProjectionOutput("projector", (40, 30), mode="clean",
+                                warp=ProjectionWarp((40, 30), corners=[[0.05, 0], [1, 0], [1, 1], [0, 0.9]],
+                                                    cache_dir=None))]
+    outputs[0].window_name = "main"
+    for output in outputs[1:]:
+        output.window_name = output.name
+        presenter.add_window(output.name)
+    controller = FakeController([np.full((48, 64, 3), 200, dtype=np.uint8)])
+    prepared = []
+    start_prefetch = controller.start_prefetch
+    controller.start_prefetch = lambda prepare, queue_size: start_prefetch(
+        lambda frame: prepared.append(prepare(frame)) or prepared[-1], queue_size)
+    sink = ProjectionSink(controller, presenter, ProjectionMetrics(), outputs, decode_queue=4)
+
+    sink.consume(FramePacket(1, np.zeros((48, 64, 3), dtype=np.uint8), time.perf_counter()))
+
+    # One queued item holds every output's frame, remap included; the render loop presents them as is
+    assert len(prepared) == 1 and len(prepared[0]) == 3
+    for output, frame in zip(outputs, prepared[0]):
+        presented = presenter.windows[output.window_name].mailbox.take()[0]
+        assert presented is frame
+        assert (presented.shape[1], presented.shape[0]) == output.size
@@ -0,0 +1,68 @@
+import pytest
+
+from projection import StubClassifier, SyntheticCapture, is_stub_model, is_synthetic, open_capture
+
+
+def test_from_spec_defaults():
+    capture = SyntheticCapture.from_spec("synthetic")
+    assert (capture.width, capture.height, capture.fps, capture.motion) == (1280, 720, 30.0, "pan")
+    assert capture.hand_every == 0.0
+
+
+def test_from_spec_full():
+    capture = SyntheticCapture.from_spec(
+        "synthetic:640x360@60?motion=noise&hand_every=2&hand_duration=0.5&hand_start=1&realtime=0&seed=7")
+    assert (capture.width, capture.height, capture.fps, capture.motion) == (640, 360, 60.0, "noise")
+    assert (capture.hand_every, capture.hand_duration, capture.hand_start) == (2.0, 0.5, 1.0)
+    assert not capture.realtime
+
+
+def test_from_spec_fps_only():
+    capture = SyntheticCapture.from_spec("synthetic@15")
+    assert (capture.width, capture.height, capture.fps) == (1280, 720, 15.0)
+
+
+@pytest.mark.parametrize("spec", ["synthetic:640", "synthetic?motion=wobble", "synthetic?volume=3", "synthetic@fast"])
+def test_from_spec_rejects_bad_specs(spec):
+    with pytest.raises(ValueError):
+        SyntheticCapture.from_spec(spec)
+
+
+def test_hand_events_follow_the_schedule_and_the_stub_sees_them():
+    capture = SyntheticCapture.from_spec("synthetic:64x48@10?hand_every=1&hand_duration=0.25&realtime=0")
+    classifier = StubClassifier()
+    seen = []
+    for _ in range(25):
+        ok, frame = capture.read()
+        assert ok and frame.shape == (48, 64, 3)
+        seen.append(classifier.classify(frame)[0] == "hand")
+    # 10 FPS: hands on frames 10-12 and 20-22
+    assert [i for i, hand in enumerate(seen) if hand] == [10, 11, 12, 20, 21, 22]
+    assert len(capture.hand_onsets) == 2
+
+
+def test_stub_from_spec():
+    stub = StubClassifier.from_spec("stub:15:5")
+    assert (stub.latency, stub.jitter) == (0.015, 0.005)
+    assert StubClassifier.from_spec("stub").latency == 0.0
+
+
+def test_source_detection():
+    assert is_synthetic("synthetic:640x480") and not is_synthetic(0) and not is_synthetic("videos/a.mp4")
+    assert is_stub_model("stub:10") and not is_stub_model("Colin1.pt")
+    assert isinstance(open_capture("synthetic@5"), SyntheticCapture)
+
+
+@pytest.mark.parametrize("source", ["synthetic", "synthetic:640x480", "synthetic@5", "synthetic?motion=noise"])
+def test_synthetic_specs(source):
+    assert is_synthetic(source)
+
+
+@pytest.mark.parametrize("source", ["synthetic_clip.mp4", "synthetic.mp4", "synthetics/a.mp4", 0])
+def test_files_named_synthetic_are_not_specs(source):
+    assert not is_synthetic(source)
+
+
+@pytest.mark.parametrize("model", ["stub_hands.pt", "stub.pt", "stubborn.pt", "stubs/hands.pt"])
+def test_model_files_named_stub_are_not_stubs(model):
+    assert not is_stub_model(model)
@@ -0,0 +1,64 @@
+import math
+import types
+
+import pytest
+
+from projection.tracing import PERCENTILES, STAGES, LatencyTracer, percentile
+
+
+def packet(captured_at):
+    return types.SimpleNamespace(captured_at=captured_at, read_at=captured_at + 0.001,
+                                 inferred_at=captured_at + 0.011, decided_at=captured_at + 0.012)
+
+
+def test_percentile_of_no_values_is_nan():
+    assert math.isnan(percentile([], 50))
+
+
+@pytest.mark.parametrize("q, expected", [(0, 1), (50, 3), (90, 5), (100, 5)])
+def test_percentile_is_nearest_rank(q, expected):
+    assert percentile([5, 1, 4, 2, 3], q) == expected
+
+
+def test_percentile_of_one_value():
+    assert all(percentile([0.25], q) == 0.25 for q in PERCENTILES)
+
+
+def test_trace_stages_add_up_to_total():
+    tracer = LatencyTracer(log_each=False)
+    trace = tracer.begin(packet(10.0))
+    trace.submitted(10.020)
+    trace.presented(10.030)
+    stages = trace.stages()
+    assert tuple(stages) == STAGES
+    assert stages["output"] == pytest.approx(0.008)
+    assert stages["present"] == pytest.approx(0.010)
+    assert sum(stages.values()) == pytest.approx(trace.total)
+
+
+def test_presented_completes_a_trace_once():
+    tracer = LatencyTracer(log_each=False)
+    trace = tracer.begin(packet(0.0))
+    trace.presented(0.05)
+    trace.presented(0.09)
+    assert tracer.completed == 1
+    assert trace.presented_at == 0.05
+    assert trace.submitted_at == 0.05  # Never handed over separately: no present stage
+
+
+def test_report_and_pending_count():
+    tracer = LatencyTracer(log_each=False)
+    for i in range(4):
+        tracer.begin(packet(0.0)).presented(0.1 * (i + 1))
+    tracer.begin(packet(0.0))  # Never reaches the display
+    assert tracer.started - tracer.completed == 1
+    report = tracer.report()
+    assert report["total"][50] == pytest.approx(0.3)
+    assert report["total"][99] == pytest.approx(0.4)
+    stats = tracer.stats()
+    assert stats["trigger_latency_samples"] == 4
+    assert stats["trigger_latency_p50_seconds"] == pytest.approx(0.3)
+
+
+def test_stats_without_traces():
+    assert LatencyTracer(log_each=False).stats() == {"trigger_latency_samples": 0}
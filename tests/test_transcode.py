@@ -0,0 +1,91 @@
+import os
+import shutil
+
+import cv2
+import numpy as np
+import pytest
+
+from projection import CachedClip, RawClip, find_transcoded, open_prepared_clip, transcode, transcode_clip
+
+
+def write_clip(path, frames=20, start=0):
+    """MJPG clip whose frame i is filled with brightness 5 * (start + i)"""
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 30.0, (32, 24))
+    if not writer.isOpened():
+        pytest.skip("No MJPG writer in this OpenCV build")
+    for i in range(frames):
+        writer.write(np.full((24, 32, 3), 5 * (start + i), dtype=np.uint8))
+    writer.release()
+    return path
+
+
+def frame_number(frame):
+    return int(round(np.asarray(frame).mean() / 5))
+
+
+@pytest.fixture
+def clip(tmp_path):
+    return write_clip(str(tmp_path / "clip.avi"))
+
+
+@pytest.fixture
+def cache_dir(tmp_path):
+    return str(tmp_path / "cache")
+
+
+def test_renamed_clip_hits_and_edited_clip_misses(tmp_path, clip, cache_dir):
+    transcode_clip(clip, (32, 24), cache_dir)
+    renamed = str(tmp_path / "renamed.avi")
+    shutil.copy(clip, renamed)
+    assert find_transcoded(renamed, cache_dir) is not None
+
+    write_clip(clip, frames=12, start=10)
+    os.utime(clip, ns=(0, os.stat(clip).st_mtime_ns + 10 ** 9))
+    assert find_transcoded(clip, cache_dir) is None
+
+
+def test_find_transcoded_prefers_exact_size_then_raw(clip, cache_dir):
+    transcode_clip(clip, (32, 24), cache_dir, fmt="mjpg")
+    transcode_clip(clip, (16, 12), cache_dir, fmt="raw")
+    assert find_transcoded(clip, cache_dir, (16, 12))["format"] == "raw"
+    assert find_transcoded(clip, cache_dir, (32, 24))["format"] == "mjpg"
+    assert find_transcoded(clip, cache_dir, (64, 48))["size"] == [32, 24]  # No exact match: the largest
+
+    transcode_clip(clip, (32, 24), cache_dir, fmt="raw")
+    assert find_transcoded(clip, cache_dir, (32, 24))["format"] == "raw"
+
+
+def test_raw_entry_keeps_every_frame(clip, cache_dir):
+    meta = transcode_clip(clip, (32, 24), cache_dir, fmt="raw")
+    assert meta["frames"] == 20
+    assert np.load(os.path.join(cache_dir, meta["file"]), mmap_mode="r").shape == (20, 24, 32, 3)
+
+
+@pytest.mark.parametrize("counted", [12, 30])
+def test_raw_entry_missing_frames_is_never_published(monkeypatch, clip, cache_dir, counted):
+    monkeypatch.setattr(transcode, "count_frames", lambda path: counted)
+    with pytest.raises(IOError):
+        transcode_clip(clip, (32, 24), cache_dir, fmt="raw")
+    assert find_transcoded(clip, cache_dir) is None
+    assert not [name for name in os.listdir(cache_dir) if name.endswith(".npy")]
+
+
+def test_raw_clip_loops_and_restarts(clip, cache_dir):
+    meta = transcode_clip(clip, (32, 24), cache_dir, fmt="raw")
+    raw = RawClip(os.path.join(cache_dir, meta["file"]), meta["fps"], meta["frames"])
+    assert [frame_number(raw.read()) for _ in range(22)][-3:] == [19, 0, 1]
+    raw.restart()
+    assert frame_number(raw.read()) == 0
+
+
+def test_open_prepared_clip_uses_the_cache_entry(clip, cache_dir):
+    transcode_clip(clip, (32, 24), cache_dir, fmt="raw")
+    assert isinstance(open_prepared_clip(clip, cache_dir=cache_dir, size=(32, 24)), RawClip)
+
+
+@pytest.mark.parametrize("use_cache", [True, False])
+def test_open_prepared_clip_falls_back_to_the_original(clip, cache_dir, use_cache):
+    os.makedirs(cache_dir)
+    prepared = open_prepared_clip(clip, cache_budget_mb=64, cache_dir=cache_dir if use_cache else "")
+    assert isinstance(prepared, CachedClip)
+    assert frame_number(prepared.read()) == 0